@@ -28,11 +28,69 @@ class Settings(BaseSettings):
     NPS_API_KEY: str = os.getenv("NPS_API_KEY")
     WEATHER_API_KEY: str = os.getenv("WEATHER_API_KEY", "")
 
+    # Per-attempt upstream timeouts in seconds
+    NPS_TIMEOUT: float = float(os.getenv("NPS_TIMEOUT", "10"))
+    WEATHER_TIMEOUT: float = float(os.getenv("WEATHER_TIMEOUT", "10"))
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "90"))
+
     # Auth
     SUPABASE_URL: str = os.getenv("SUPABASE_URL")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY")
     SUPABASE_SECRET_KEY: Optional[str] = os.getenv("SUPABASE_SECRET_KEY")
 
+    # Thread pool for blocking work in auth routes
+    AUTH_EXECUTOR_WORKERS: int = int(os.getenv("AUTH_EXECUTOR_WORKERS", "8"))
+    AUTH_EXECUTOR_QUEUE: int = int(os.getenv("AUTH_EXECUTOR_QUEUE", "64"))
+
+    # Logging: per-logger sample rates ("app.routes.parks=0.1") and per-second limits ("app.routes=100")
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "")
+    LOG_RATE_LIMITS: str = os.getenv("LOG_RATE_LIMITS", "")
+
+    # Request tracing: fraction of traces kept for /debug/traces, and an optional JSONL export file
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+    TRACE_BUFFER_SIZE: int = int(os.getenv("TRACE_BUFFER_SIZE", "500"))
+    TRACE_FILE: Optional[str] = os.getenv("TRACE_FILE")
+
+    # Sampling profiler for slow requests (off unless PROFILE_ENABLED=true)
+    PROFILE_ENABLED: bool = os.getenv("PROFILE_ENABLED", "false").lower() == "true"
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_THRESHOLD_MS: float = float(os.getenv("PROFILE_THRESHOLD_MS", "2000"))
+    PROFILE_INTERVAL_MS: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
+    # Event-loop lag monitor and blocking-call detector (off unless LOOP_MONITOR_ENABLED=true)
+    LOOP_MONITOR_ENABLED: bool = os.getenv("LOOP_MONITOR_ENABLED", "false").lower() == "true"
+    LOOP_MONITOR_INTERVAL_MS: float = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "20"))
+    LOOP_BLOCK_THRESHOLD_MS: float = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+    LOOP_MONITOR_BASELINE: Optional[str] = os.getenv("LOOP_MONITOR_BASELINE")
+
+    # How long results of requests sent with an Idempotency-Key are replayed
+    IDEMPOTENCY_TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_MAX_KEYS: int = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+    IDEMPOTENCY_LOCK_SECONDS: float = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "120"))
+
+    # Number of decompressed itinerary bodies kept in memory per worker
+    BLOB_CACHE_SIZE: int = int(os.getenv("BLOB_CACHE_SIZE", "512"))
+
+    # Debug endpoints are disabled unless a token is configured
+    DEBUG_TOKEN: Optional[str] = os.getenv("DEBUG_TOKEN")
+
+    # Shared-memory park catalog used in multi-worker mode
+    PARK_CATALOG_SIZE: int = int(os.getenv("PARK_CATALOG_SIZE", str(8 * 1024 * 1024)))
+    PARK_CATALOG_REFRESH_SECONDS: float = float(os.getenv("PARK_CATALOG_REFRESH_SECONDS", "300"))
+
+    # Background forecast refresher
+    WEATHER_REFRESH_SECONDS: float = float(os.getenv("WEATHER_REFRESH_SECONDS", "10800"))
+    WEATHER_REFRESH_CONCURRENCY: int = int(os.getenv("WEATHER_REFRESH_CONCURRENCY", "4"))
+    WEATHER_SEGMENT_SIZE: int = int(os.getenv("WEATHER_SEGMENT_SIZE", str(2 * 1024 * 1024)))
+
+    # Contact form write-behind queue
+    CONTACT_SPILL_PATH: str = os.getenv("CONTACT_SPILL_PATH", "contact_spill.jsonl")
+    CONTACT_BATCH_SIZE: int = int(os.getenv("CONTACT_BATCH_SIZE", "50"))
+    CONTACT_FLUSH_INTERVAL: float = float(os.getenv("CONTACT_FLUSH_INTERVAL", "2.0"))
+
     class Config:
         env_file = ".env"
         case_sensitive = True
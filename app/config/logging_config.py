@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Set per request by the request id middleware in app.main
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None)
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """
+    Per-logger sampling and rate limiting for records below WARNING.
+    Rules match the longest logger-name prefix, so "app.routes" covers
+    every route module unless a more specific rule exists.
+    """
+
+    def __init__(self, sample_rates: Dict[str, float], rate_limits: Dict[str, int]):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.rate_limits = rate_limits
+        self._windows: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def _rule(self, rules: Dict, name: str):
+        while name:
+            if name in rules:
+                return name, rules[name]
+            name = name.rpartition(".")[0]
+        return None, None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        _, rate = self._rule(self.sample_rates, record.name)
+        if rate is not None and random.random() >= rate:
+            return False
+
+        key, limit = self._rule(self.rate_limits, record.name)
+        if limit is not None:
+            second = int(time.monotonic())
+            with self._lock:
+                window = self._windows.setdefault(key, [second, 0])
+                if window[0] != second:
+                    window[0], window[1] = second, 0
+                if window[1] >= limit:
+                    return False
+                window[1] += 1
+        return True
+
+class RequestQueueHandler(QueueHandler):
+    """
+    Queue handler that stamps the request id and defers formatting.
+    The record is handed to the listener thread as-is, so message
+    interpolation and JSON encoding happen off the request path.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id_var.get()
+        return record
+
+def _parse_rules(raw: str, cast) -> Dict:
+    rules = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        name, _, value = item.partition("=")
+        rules[name.strip()] = cast(value)
+    return rules
+
+def setup_logging(level: str = "INFO", sample_rates: str = "", rate_limits: str = ""):
+    """
+    Route all logging through a queue to a background JSON writer on stdout.
+
+    Args:
+        level (str): Root log level
+        sample_rates (str): e.g. "app.routes.parks=0.1,app.utils=0.5"
+        rate_limits (str): Max records per second, e.g. "app.routes=100"
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = RequestQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(_parse_rules(sample_rates, float), _parse_rules(rate_limits, int)))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level.upper())
+
+    _queue_handler = queue_handler
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+def _restart_after_fork():
+    """
+    Give a forked child (a gunicorn worker of a preloaded app) its own queue and
+    writer thread; the parent's thread doesn't survive the fork, so records put
+    on the inherited queue would never be written.
+    """
+    global _listener
+    if _listener is None:
+        return
+    for log_filter in _queue_handler.filters:
+        if isinstance(log_filter, SamplingFilter):
+            # The parent may have held it mid-record when it forked
+            log_filter._lock = threading.Lock()
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,9 +1,10 @@
 from sqlmodel import Session
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+from typing import Generator, Optional
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from supabase import create_client, Client
 from app.config.config import settings, engine, SUPABASE_URL, SUPABASE_KEY
+from app.tracing import span
 from .services.nps_service import NPSService
 from .services.openai_service import OpenAIService
 from .services.weather_service import WeatherService
@@ -26,11 +27,17 @@ def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> str:
     try:
-        user = supabase.auth.get_user(credentials.credentials)
+        with span("auth"):
+            user = supabase.auth.get_user(credentials.credentials)
         return user.user.id
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+        )
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)):
+    # Hide debug endpoints entirely unless DEBUG_TOKEN is set and matches
+    if not settings.DEBUG_TOKEN or x_debug_token != settings.DEBUG_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
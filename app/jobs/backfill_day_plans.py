@@ -0,0 +1,63 @@
+"""
+Backfill the day_plan column for itineraries created before it existed.
+
+Usage:
+    python -m app.jobs.backfill_day_plans [--batch-size 500]
+"""
+import argparse
+import time
+from app.config.config import supabase_client
+from app.services.itinerary_parser import ItineraryParser
+
+def backfill_day_plans(batch_size: int = 500) -> int:
+    """
+    Parse and store day plans for every itinerary missing one.
+
+    Rows are fetched and written back in batches, one upsert per batch.
+    Parsed rows drop out of the `day_plan is null` filter, so each pass
+    reads from the start of the remaining set.
+
+    Args:
+        batch_size (int): Number of rows read and upserted per round trip
+
+    Returns:
+        int: Number of itineraries updated
+    """
+    parser = ItineraryParser()
+    updated = 0
+
+    while True:
+        response = (
+            supabase_client.table("itineraries")
+            .select("*")
+            .is_("day_plan", "null")
+            # Blob-backed rows keep their day plan in itinerary_blobs
+            .is_("description_hash", "null")
+            .order("id")
+            .range(0, batch_size - 1)
+            .execute()
+        )
+        rows = response.data
+        if not rows:
+            break
+
+        for row in rows:
+            row["day_plan"] = parser.parse(row.get("description"))
+
+        supabase_client.table("itineraries").upsert(rows).execute()
+        updated += len(rows)
+        print(f"Backfilled {updated} itineraries")
+
+        if len(rows) < batch_size:
+            break
+
+    return updated
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Backfill structured day plans for itineraries")
+    arg_parser.add_argument("--batch-size", type=int, default=500)
+    args = arg_parser.parse_args()
+
+    started = time.perf_counter()
+    total = backfill_day_plans(args.batch_size)
+    print(f"Done: {total} itineraries in {time.perf_counter() - started:.1f}s")
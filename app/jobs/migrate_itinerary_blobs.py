@@ -0,0 +1,109 @@
+"""
+Move inline itinerary descriptions into itinerary_blobs, and optionally
+delete blobs no itinerary references any more.
+
+Usage:
+    python -m app.jobs.migrate_itinerary_blobs [--batch-size 500] [--gc]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Set
+from app.config.config import supabase_client
+from app.services.blob_store import ItineraryBlobStore
+from app.services.itinerary_parser import ItineraryParser
+
+# Blobs written more recently than this may belong to an itinerary that is still being inserted
+GC_GRACE_PERIOD = timedelta(hours=1)
+
+def migrate_descriptions(batch_size: int = 500) -> int:
+    """
+    Store every inline description as a blob and point its row at it.
+
+    Migrated rows drop out of the `description_hash is null` filter, so each
+    pass reads from the start of the remaining set.
+
+    Args:
+        batch_size (int): Number of rows read and upserted per round trip
+
+    Returns:
+        int: Number of itineraries migrated
+    """
+    blob_store = ItineraryBlobStore(supabase_client, cache_size=batch_size)
+    parser = ItineraryParser()
+    migrated = 0
+
+    while True:
+        response = (
+            supabase_client.table("itineraries")
+            .select("*")
+            .is_("description_hash", "null")
+            .not_.is_("description", "null")
+            .order("id")
+            .range(0, batch_size - 1)
+            .execute()
+        )
+        rows = response.data
+        if not rows:
+            break
+
+        for row in rows:
+            row.update(blob_store.body_fields(row["description"], row.get("day_plan") or parser.parse(row["description"])))
+
+        supabase_client.table("itineraries").upsert(rows).execute()
+        migrated += len(rows)
+        print(f"Migrated {migrated} itineraries")
+
+        if len(rows) < batch_size:
+            break
+
+    return migrated
+
+def _column_values(table: str, column: str, batch_size: int, referenced_before: Optional[str] = None) -> Set[str]:
+    values = set()
+    start = 0
+    while True:
+        query = supabase_client.table(table).select(column).order(column)
+        if referenced_before:
+            query = query.lt("last_referenced_at", referenced_before)
+        rows = query.range(start, start + batch_size - 1).execute().data
+        values.update(row[column] for row in rows if row[column])
+        if len(rows) < batch_size:
+            return values
+        start += batch_size
+
+def collect_garbage(batch_size: int = 500) -> int:
+    """
+    Delete blobs that no itinerary references (e.g. left behind by edits) and
+    that haven't been written within the grace period.
+
+    Returns:
+        int: Number of blobs deleted
+    """
+    cutoff = (datetime.now(timezone.utc) - GC_GRACE_PERIOD).isoformat()
+    candidates = _column_values("itinerary_blobs", "hash", batch_size, referenced_before=cutoff)
+    orphans = sorted(candidates - _column_values("itineraries", "description_hash", batch_size))
+
+    for start in range(0, len(orphans), batch_size):
+        # Re-check the timestamp so a blob written again since the scan survives
+        (
+            supabase_client.table("itinerary_blobs")
+            .delete()
+            .in_("hash", orphans[start:start + batch_size])
+            .lt("last_referenced_at", cutoff)
+            .execute()
+        )
+    print(f"Deleted {len(orphans)} unreferenced blobs")
+    return len(orphans)
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Move itinerary descriptions into deduplicated blobs")
+    arg_parser.add_argument("--batch-size", type=int, default=500)
+    arg_parser.add_argument("--gc", action="store_true", help="Also delete unreferenced blobs")
+    args = arg_parser.parse_args()
+
+    started = time.perf_counter()
+    total = migrate_descriptions(args.batch_size)
+    if args.gc:
+        collect_garbage(args.batch_size)
+    print(f"Done: {total} itineraries in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,152 @@
+"""
+Sync the parks table from the NPS API.
+
+Fetches every park page concurrently, keeps the national parks, and diffs
+them against the table by parkcode and content hash. Only new or changed rows
+are written, in a single batched upsert inside one transaction. Parks already
+in the table keep their existing id.
+
+Usage:
+    python -m app.jobs.sync_parks [--all-units] [--dry-run]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Dict, List
+from uuid import UUID
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+from app.config.config import engine
+from app.models.park import Park, ParkActivity
+from app.services.activity_index import load_park_activities
+from app.services.nps_service import NPSService
+
+NATIONAL_PARK_DESIGNATIONS = {
+    "National Park",
+    "National Parks",
+    "National Park & Preserve",
+    "National and State Parks"
+}
+
+# Columns compared when deciding whether a row changed; id is only set on insert
+SYNCED_FIELDS = ("parkcode", "name", "description", "location", "latitude", "longitude", "official_website")
+
+def normalize_park(nps_park: Dict) -> Dict:
+    """Map an NPS API park record onto the columns of the parks table."""
+    latitude = float(nps_park["latitude"]) if nps_park.get("latitude") else None
+    longitude = float(nps_park["longitude"]) if nps_park.get("longitude") else None
+    return {
+        "id": str(UUID(nps_park["id"])),
+        "parkcode": nps_park["parkCode"].lower(),
+        "name": nps_park["fullName"],
+        "description": nps_park.get("description") or "",
+        "location": {"lat": latitude, "lng": longitude, "states": nps_park.get("states", "")},
+        "latitude": latitude,
+        "longitude": longitude,
+        "official_website": nps_park.get("url") or ""
+    }
+
+def park_activities(nps_park: Dict) -> List[str]:
+    """Sorted, de-duplicated activity names from an NPS API park record."""
+    return sorted({activity["name"] for activity in nps_park.get("activities") or [] if activity.get("name")})
+
+def content_hash(row: Dict) -> str:
+    payload = json.dumps({field: row.get(field) for field in SYNCED_FIELDS}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def adopt_existing_ids(incoming: List[Dict], existing: List[Dict]) -> List[Dict]:
+    """
+    Give incoming rows the id of the stored park with the same parkcode.
+    The table was first filled outside this job, so its ids need not match NPS ids.
+    """
+    existing_ids = {row["parkcode"]: str(row["id"]) for row in existing}
+    return [dict(row, id=existing_ids.get(row["parkcode"], row["id"])) for row in incoming]
+
+def diff_parks(incoming: List[Dict], existing: List[Dict]) -> Dict[str, List[Dict]]:
+    """Split incoming rows into inserts and updates by parkcode; rows with an identical hash are left alone."""
+    existing_hashes = {row["parkcode"]: content_hash(row) for row in existing}
+    inserts, updates = [], []
+    for row in incoming:
+        current = existing_hashes.get(row["parkcode"])
+        if current is None:
+            inserts.append(row)
+        elif current != content_hash(row):
+            updates.append(row)
+    return {"inserts": inserts, "updates": updates}
+
+def apply_changes(session: Session, rows: List[Dict]):
+    """Write all changed rows with one INSERT ... ON CONFLICT DO UPDATE statement."""
+    if not rows:
+        return
+    now = datetime.utcnow()
+    values = [dict(row, id=UUID(row["id"]), created_at=now) for row in rows]
+    statement = insert(Park.__table__).values(values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[Park.__table__.c.parkcode],
+        # id and created_at keep their original values on update
+        set_={field: statement.excluded[field] for field in SYNCED_FIELDS if field != "parkcode"}
+    )
+    session.execute(statement)
+
+def diff_activities(incoming: Dict[str, List[str]], existing: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Parks (by id) whose activity list differs from the stored one."""
+    return {park_id: names for park_id, names in incoming.items() if existing.get(park_id, []) != names}
+
+def apply_activity_changes(session: Session, changed: Dict[str, List[str]]):
+    """Replace the activity rows of every changed park: one DELETE and one INSERT."""
+    if not changed:
+        return
+    park_ids = [UUID(park_id) for park_id in changed]
+    session.execute(delete(ParkActivity.__table__).where(ParkActivity.__table__.c.park_id.in_(park_ids)))
+    values = [
+        {"park_id": UUID(park_id), "activity": name}
+        for park_id, names in changed.items() for name in names
+    ]
+    if values:
+        session.execute(insert(ParkActivity.__table__).values(values))
+
+async def sync_parks(all_units: bool = False, dry_run: bool = False) -> Dict:
+    started = time.perf_counter()
+    nps_parks = await NPSService().get_all_parks()
+    fetched_at = time.perf_counter()
+
+    selected = [
+        park for park in nps_parks
+        if all_units or park.get("designation") in NATIONAL_PARK_DESIGNATIONS
+    ]
+    incoming = [normalize_park(park) for park in selected]
+
+    with Session(engine) as session:
+        existing = [park.model_dump(mode="json") for park in session.exec(select(Park)).all()]
+        incoming = adopt_existing_ids(incoming, existing)
+        incoming_activities = {row["id"]: park_activities(park) for row, park in zip(incoming, selected)}
+        changes = diff_parks(incoming, existing)
+        activity_changes = diff_activities(incoming_activities, load_park_activities(session))
+        if not dry_run:
+            apply_changes(session, changes["inserts"] + changes["updates"])
+            apply_activity_changes(session, activity_changes)
+            session.commit()
+
+    return {
+        "fetched": len(nps_parks),
+        "matched": len(incoming),
+        "inserted": len(changes["inserts"]),
+        "updated": len(changes["updates"]),
+        "unchanged": len(incoming) - len(changes["inserts"]) - len(changes["updates"]),
+        "activities_updated": len(activity_changes),
+        "fetch_seconds": round(fetched_at - started, 2),
+        "total_seconds": round(time.perf_counter() - started, 2),
+        "dry_run": dry_run
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync the parks table from the NPS API")
+    parser.add_argument("--all-units", action="store_true", help="Include every NPS unit, not just national parks")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing them")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(sync_parks(args.all_units, args.dry_run)), indent=2))
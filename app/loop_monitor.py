@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from app.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(APP_DIR)
+# Upper bounds (ms) of the lag histogram buckets
+LAG_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf"))
+
+class LoopMonitor:
+    """
+    Measures event-loop lag and finds the sync calls that cause it.
+    A heartbeat task sleeps for a fixed interval and records how late it wakes
+    up in a histogram. A watchdog thread notices when a heartbeat is overdue
+    by more than the threshold and captures the loop thread's stack while it
+    is still blocked; the stall is attributed to the route whose endpoint is on
+    that stack and to the innermost frame in app/ (the call site).
+    """
+
+    def __init__(self, enabled: bool, interval_ms: float, threshold_ms: float, baseline_path: Optional[str] = None):
+        self.enabled = enabled
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.baseline_path = baseline_path
+        self._histogram = [0] * len(LAG_BUCKETS)
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._offenders: Dict[str, Dict] = {}
+        self._routes: Dict = {}
+        self._deadline = 0.0
+        self._capture: Optional[Dict] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    async def start(self, app: FastAPI):
+        """Start monitoring the running loop; `app` is used to map endpoints to routes."""
+        if not self.enabled or self._task is not None:
+            return
+        self._routes = {
+            route.endpoint.__code__: f"{','.join(sorted(route.methods))} {route.path}"
+            for route in app.routes
+            if isinstance(route, APIRoute) and hasattr(route.endpoint, "__code__")
+        }
+        self._loop_thread_id = threading.get_ident()
+        self._deadline = time.monotonic() + self.interval
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._watchdog.join()
+        self._watchdog = None
+
+    async def _heartbeat(self):
+        while True:
+            deadline = time.monotonic() + self.interval
+            self._deadline = deadline
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - deadline)
+            self._record_lag(lag)
+
+            capture, self._capture = self._capture, None
+            if capture is not None and capture["deadline"] == deadline:
+                self._record_block(capture, lag)
+
+    def _watch(self):
+        captured_deadline = None
+        while not self._stopping.wait(self.interval):
+            deadline = self._deadline
+            if deadline == captured_deadline or time.monotonic() - deadline < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            # One capture per stall, taken while the loop is still blocked
+            self._capture = {"deadline": deadline, **self._describe(frame)}
+            captured_deadline = deadline
+
+    def _describe(self, frame) -> Dict:
+        route = None
+        call_site = None
+        call_line = None
+        leaf = f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+        stack = traceback.format_stack(frame)
+        while frame is not None:
+            code = frame.f_code
+            path = os.path.abspath(code.co_filename)
+            if call_site is None and path.startswith(APP_DIR) and path != os.path.abspath(__file__):
+                call_site = f"{os.path.relpath(path, PROJECT_DIR)}:{code.co_name}"
+                call_line = frame.f_lineno
+            if route is None and code in self._routes:
+                route = self._routes[code]
+            frame = frame.f_back
+        return {
+            "route": route or "(no route)",
+            "call_site": call_site or leaf,
+            "line": call_line,
+            "leaf": leaf,
+            "stack": "".join(stack[-20:])
+        }
+
+    def _record_lag(self, lag: float):
+        lag_ms = lag * 1000
+        for index, bound in enumerate(LAG_BUCKETS):
+            if lag_ms <= bound:
+                self._histogram[index] += 1
+                break
+        self._lag_total += lag
+        self._lag_max = max(self._lag_max, lag)
+
+    def _record_block(self, capture: Dict, lag: float):
+        key = f"{capture['route']} {capture['call_site']}"
+        offender = self._offenders.get(key)
+        if offender is None:
+            offender = self._offenders[key] = {
+                "key": key,
+                "route": capture["route"],
+                "call_site": capture["call_site"],
+                "line": capture["line"],
+                "leaf": capture["leaf"],
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "stack": capture["stack"]
+            }
+            logger.warning("Event loop blocked %.0fms by %s", lag * 1000, key)
+        offender["count"] += 1
+        offender["total_ms"] = round(offender["total_ms"] + lag * 1000, 1)
+        if lag * 1000 > offender["max_ms"]:
+            # Keep the stack of the worst stall
+            offender["max_ms"] = round(lag * 1000, 1)
+            offender["stack"] = capture["stack"]
+            offender["line"] = capture["line"]
+
+    def report(self, limit: int = 20) -> Dict:
+        """Lag histogram and the worst blocking call sites by total blocked time."""
+        samples = sum(self._histogram)
+        known = self._load_baseline()
+        offenders = sorted(self._offenders.values(), key=lambda offender: offender["total_ms"], reverse=True)
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold * 1000,
+            "lag": {
+                "samples": samples,
+                "mean_ms": round(self._lag_total / samples * 1000, 2) if samples else None,
+                "max_ms": round(self._lag_max * 1000, 2),
+                "histogram": {
+                    f"<={bound:g}ms" if bound != float("inf") else f">{LAG_BUCKETS[-2]:g}ms": count
+                    for bound, count in zip(LAG_BUCKETS, self._histogram)
+                }
+            },
+            "offenders": [
+                {**offender, "new": known is not None and offender["key"] not in known}
+                for offender in offenders[:limit]
+            ]
+        }
+
+    def new_offenders(self) -> List[Dict]:
+        """Blocking call sites seen in this process that are not in the baseline file."""
+        known = self._load_baseline() or set()
+        return [offender for key, offender in self._offenders.items() if key not in known]
+
+    def assert_no_new_blocking_calls(self):
+        """
+        Fail (e.g. at the end of a test session) if a blocking call site
+        appeared that isn't in the baseline file.
+
+        Raises:
+            AssertionError: Listing each new route and call site
+        """
+        new = self.new_offenders()
+        if new:
+            details = "\n".join(f"  {offender['key']} (max {offender['max_ms']}ms)" for offender in new)
+            raise AssertionError(f"New blocking calls on the event loop:\n{details}")
+
+    def write_baseline(self, path: Optional[str] = None):
+        """Accept every call site seen so far, merged with the existing baseline."""
+        path = path or self.baseline_path
+        keys = sorted((self._load_baseline() or set()) | set(self._offenders))
+        with open(path, "w") as baseline_file:
+            json.dump(keys, baseline_file, indent=2)
+            baseline_file.write("\n")
+
+    def _load_baseline(self) -> Optional[set]:
+        if not self.baseline_path or not os.path.exists(self.baseline_path):
+            return None
+        with open(self.baseline_path) as baseline_file:
+            return set(json.load(baseline_file))
+
+loop_monitor = LoopMonitor(
+    enabled=settings.LOOP_MONITOR_ENABLED,
+    interval_ms=settings.LOOP_MONITOR_INTERVAL_MS,
+    threshold_ms=settings.LOOP_BLOCK_THRESHOLD_MS,
+    baseline_path=settings.LOOP_MONITOR_BASELINE
+)
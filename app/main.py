@@ -1,23 +1,45 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import auth
 from app.routes.parks import router as parks_router
 from app.routes.itineraries import itineraries_router
-from app.routes.contact import contact_router
-from app.config.config import engine
+from app.routes.contact import contact_router, contact_queue
+from app.routes.debug import debug_router
+from app.config.config import engine, settings
+from app.config.logging_config import setup_logging, shutdown_logging, request_id_var
+from app.tracing import Trace, current_trace, trace_recorder
+from app.profiler import request_profiler
+from app.loop_monitor import loop_monitor
+from app.services.forecast_refresher import forecast_refresher
 from sqlmodel import SQLModel
+from contextlib import asynccontextmanager
+from uuid import uuid4
+import re
 
-app = FastAPI(
-    title="National Parks Explorer API",
-    description="API for exploring US National Parks, creating itineraries, and getting park information",
-    version="1.0.0"
-)
+setup_logging(settings.LOG_LEVEL, settings.LOG_SAMPLE_RATES, settings.LOG_RATE_LIMITS)
 
+@asynccontextmanager
 async def lifespan(app: FastAPI):
     SQLModel.metadata.create_all(engine)
+    await contact_queue.start()
+    # Under gunicorn the refresher process refreshes forecasts for every worker
+    if settings.WEATHER_API_KEY and not forecast_refresher.shared:
+        await forecast_refresher.start()
+    await loop_monitor.start(app)
     yield
+    await loop_monitor.stop()
+    await forecast_refresher.stop()
+    await contact_queue.stop()
+    auth.auth_executor.shutdown()
+    trace_recorder.close()
+    shutdown_logging()
 
-app.lifespan = lifespan
+app = FastAPI(
+    title="National Parks Explorer API",
+    description="API for exploring US National Parks, creating itineraries, and getting park information",
+    version="1.0.0",
+    lifespan=lifespan
+)
 
 origins = [
     "http://localhost",
@@ -37,7 +59,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID", "X-Itinerary-Status", "Idempotent-Replayed"],
 )
+# Client-supplied request ids are reused only if they are short and filename-safe
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    # Every log record and span recorded while handling this request carries its id
+    request_id = request.headers.get("X-Request-ID", "")
+    if not REQUEST_ID_PATTERN.fullmatch(request_id):
+        request_id = uuid4().hex
+    trace = Trace(request_id, request.method, request.url.path)
+    request_id_token = request_id_var.set(request_id)
+    trace_token = current_trace.set(trace)
+    profile = request_profiler.begin(request_id, request.method, request.url.path)
+    try:
+        response = await call_next(request)
+    finally:
+        request_profiler.end(profile)
+        current_trace.reset(trace_token)
+        request_id_var.reset(request_id_token)
+    trace.finish(response.status_code)
+    trace_recorder.record(trace)
+    response.headers["X-Request-ID"] = request_id
+    response.headers["Server-Timing"] = trace.server_timing()
+    return response
+
 # Root route
 @app.get("/")
 async def root():
@@ -58,6 +106,7 @@ app.include_router(auth.router)
 app.include_router(parks_router)
 app.include_router(itineraries_router, tags=["itineraries"])
 app.include_router(contact_router)
+app.include_router(debug_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,14 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+class IdempotencyKey(SQLModel, table=True):
+    """Outcome of a request sent with an Idempotency-Key, shared by every worker."""
+    __tablename__ = "idempotency_keys"
+
+    user_id: str = Field(primary_key=True)
+    key: str = Field(primary_key=True, max_length=255)
+    fingerprint: str
+    response: Optional[str] = None  # JSON {"result", "headers"}; null while the request is in progress
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
@@ -1,7 +1,8 @@
 # app/models/itinerary.py
 from sqlmodel import SQLModel, Field
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime, date
+from sqlalchemy import Column, JSON, func
 
 class ItineraryPark(SQLModel, table=True):
     __tablename__ = "itinerary_parks"
@@ -20,5 +21,18 @@ class Itinerary(SQLModel, table=True):
     start_date: date
     end_date: date
     description: Optional[str] = None
+    # sha256 of the body in itinerary_blobs; description/day_plan are null when set
+    description_hash: Optional[str] = Field(default=None, index=True)
+    day_plan: Optional[Dict] = Field(default=None, sa_column=Column(JSON))
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ItineraryBlob(SQLModel, table=True):
+    __tablename__ = "itinerary_blobs"
+
+    hash: str = Field(primary_key=True)
+    data: str  # base64 of the zlib-compressed {"description", "day_plan"} JSON
+    size: int  # uncompressed size in bytes
+    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"server_default": func.now()})
+    # Refreshed on every write of the blob; garbage collection only removes stale ones
+    last_referenced_at: datetime = Field(default_factory=datetime.utcnow, index=True)
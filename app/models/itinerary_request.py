@@ -1,6 +1,6 @@
 # app/models/itinerary_request.py
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import date
 
 class UserPreferences(BaseModel):
@@ -12,6 +12,12 @@ class UserPreferences(BaseModel):
     start_date: date
     end_date: date
 
+class RoadTripPreferences(BaseModel):
+    parkcodes: List[str] = Field(min_length=1, max_length=63)
+    num_days: int = Field(gt=0)
+    start_date: date
+    title: Optional[str] = None
+
 # Removed ItineraryRequest class since we're getting user_id from token
 
 {
@@ -8,7 +8,7 @@ class Park(SQLModel, table=True):
     __tablename__ = "parks"
     
     id: UUID = Field(primary_key=True)
-    parkcode: str = Field(index=True)
+    parkcode: str = Field(index=True, unique=True)
     name: str
     description: str
     location: Dict = Field(sa_column=Column(JSON))
@@ -18,4 +18,23 @@ class Park(SQLModel, table=True):
     official_website: str
 
     class Config:
-        arbitrary_types_allowed = True
\ No newline at end of file
+        arbitrary_types_allowed = True
+
+class ParkPartial(SQLModel):
+    """Park response where only the requested fields are present."""
+    id: Optional[UUID] = None
+    parkcode: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[Dict] = None
+    created_at: Optional[datetime] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    official_website: Optional[str] = None
+
+class ParkActivity(SQLModel, table=True):
+    """One NPS activity offered at a park (filled by the park sync job)."""
+    __tablename__ = "park_activities"
+
+    park_id: UUID = Field(foreign_key="parks.id", primary_key=True)
+    activity: str = Field(primary_key=True)
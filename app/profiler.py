@@ -0,0 +1,172 @@
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from app.config.config import settings
+
+# Innermost (file, function) pairs that mean a thread is parked rather than doing work
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("_thread.py", "run")
+}
+
+class _ActiveRequest:
+    def __init__(self, request_id: str, method: str, path: str, forced: bool):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.forced = forced
+        self.started = time.perf_counter()
+        self.samples: Counter = Counter()
+
+class RequestProfiler:
+    """
+    Opt-in stack-sampling profiler for slow or sampled requests.
+    A watchdog thread sleeps while no request is in flight. Once a request is
+    sampled or has run past the latency threshold, it samples thread stacks
+    until the request ends. The result is written as a collapsed-stack file
+    (flamegraph.pl / speedscope format) named after the request id.
+    Samples are taken process-wide, so stacks from concurrent requests on the
+    same event loop can appear in each other's profiles.
+    """
+
+    def __init__(self, enabled: bool, sample_rate: float, threshold_ms: float,
+                 interval_ms: float, directory: str, max_profiles: int):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._active: Dict[str, _ActiveRequest] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self, request_id: str, method: str, path: str) -> Optional[_ActiveRequest]:
+        """Register a request; profiling starts once it is sampled or slow."""
+        if not self.enabled:
+            return None
+        active = _ActiveRequest(request_id, method, path, random.random() < self.sample_rate)
+        with self._condition:
+            self._active[request_id] = active
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return active
+
+    def end(self, active: Optional[_ActiveRequest]):
+        """Unregister a request and write its profile in the background if one was captured."""
+        if active is None:
+            return
+        with self._condition:
+            self._active.pop(active.request_id, None)
+            self._condition.notify()
+            # The watchdog only adds samples under the lock, and only to registered requests
+            samples = Counter(active.samples)
+        if samples:
+            duration_ms = (time.perf_counter() - active.started) * 1000
+            asyncio.get_running_loop().run_in_executor(None, self._write, active, samples, duration_ms)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        next_sample = 0.0
+        while True:
+            # Waiting on the condition (not sleeping) lets begin() and end() wake the watchdog
+            with self._condition:
+                while True:
+                    now = time.perf_counter()
+                    capturing = [
+                        request for request in self._active.values()
+                        if request.forced or now - request.started >= self.threshold
+                    ]
+                    if capturing and now >= next_sample:
+                        break
+                    if capturing:
+                        timeout = next_sample - now
+                    elif self._active:
+                        # Until the oldest request would cross the threshold
+                        oldest = min(request.started for request in self._active.values())
+                        timeout = self.threshold - (now - oldest)
+                    else:
+                        timeout = None
+                    self._condition.wait(timeout)
+
+            stacks = self._sample(own_id)
+            next_sample = time.perf_counter() + self.interval
+            with self._condition:
+                for request in capturing:
+                    if self._active.get(request.request_id) is request:
+                        request.samples.update(stacks)
+
+    def _sample(self, own_id: int) -> List[str]:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id or (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES:
+                continue
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            frames.append(names.get(thread_id, str(thread_id)))
+            stacks.append(";".join(reversed(frames)))
+        return stacks
+
+    def _write(self, active: _ActiveRequest, samples: Counter, duration_ms: float):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{active.request_id}.folded")
+        with open(path, "w") as profile_file:
+            profile_file.write(f"# {active.method} {active.path} {duration_ms:.1f}ms interval={self.interval * 1000:.0f}ms\n")
+            for stack, count in samples.most_common():
+                profile_file.write(f"{stack} {count}\n")
+
+        # Keep only the newest profiles
+        profiles = sorted(self._profile_paths(), key=os.path.getmtime, reverse=True)
+        for old in profiles[self.max_profiles:]:
+            os.remove(old)
+
+    def _profile_paths(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory) if name.endswith(".folded")
+        ]
+
+    def list_profiles(self) -> List[Dict]:
+        """Stored profiles, newest first."""
+        profiles = []
+        for path in sorted(self._profile_paths(), key=os.path.getmtime, reverse=True):
+            with open(path) as profile_file:
+                header = profile_file.readline().lstrip("# ").strip()
+            profiles.append({
+                "request_id": os.path.basename(path)[:-len(".folded")],
+                "summary": header,
+                "created_at": os.path.getmtime(path)
+            })
+        return profiles
+
+    def read_profile(self, request_id: str) -> Optional[str]:
+        path = os.path.join(self.directory, f"{os.path.basename(request_id)}.folded")
+        if not os.path.exists(path):
+            return None
+        with open(path) as profile_file:
+            return profile_file.read()
+
+request_profiler = RequestProfiler(
+    enabled=settings.PROFILE_ENABLED,
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    threshold_ms=settings.PROFILE_THRESHOLD_MS,
+    interval_ms=settings.PROFILE_INTERVAL_MS,
+    directory=settings.PROFILE_DIR,
+    max_profiles=settings.PROFILE_MAX_FILES
+)
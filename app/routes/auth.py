@@ -1,17 +1,35 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends, status
 from sqlmodel import Session
 from app.models.user import User
 from app.dependencies import get_db
-from app.config.config import SUPABASE_URL, SUPABASE_KEY
-from supabase import create_client, Client
+from app.config.config import SUPABASE_URL, SUPABASE_KEY, settings
+from app.services.executor import BoundedExecutor
+from supabase import acreate_client, AsyncClient
 from fastapi.security import OAuth2PasswordBearer
 from typing import Optional
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Async Supabase client, created on first use since construction must be awaited
+supabase: Optional[AsyncClient] = None
+_supabase_lock = asyncio.Lock()
+
+# Thread pool for the blocking local database work done by auth routes
+auth_executor = BoundedExecutor(
+    "auth",
+    max_workers=settings.AUTH_EXECUTOR_WORKERS,
+    max_queue=settings.AUTH_EXECUTOR_QUEUE
+)
+
+async def get_supabase() -> AsyncClient:
+    global supabase
+    if supabase is None:
+        async with _supabase_lock:
+            if supabase is None:
+                supabase = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+    return supabase
 
 # Token dependency for protected routes
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -25,23 +43,32 @@ class UserLogin(BaseModel):
     email: str
     password: str
 
+def _insert_user(db: Session, db_user: User):
+    try:
+        db.add(db_user)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
 async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     try:
+        client = await get_supabase()
+
         # Create user in Supabase
-        auth_response = supabase.auth.sign_up({
+        auth_response = await client.auth.sign_up({
             "email": user_data.email,
             "password": user_data.password
         })
         
-        # Create user in our database
+        # Create user in our database, on the auth pool
         db_user = User(
             id=auth_response.user.id,
             email=user_data.email,
             full_name=user_data.full_name
         )
-        db.add(db_user)
-        db.commit()
+        await auth_executor.run(_insert_user, db, db_user)
         
         return {
             "message": "User created successfully",
@@ -51,8 +78,9 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
                 "full_name": user_data.full_name
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
         raise HTTPException(
             status_code=400,
             detail=str(e)
@@ -62,7 +90,8 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
 async def login(credentials: UserLogin):
     try:
         # Authenticate user with Supabase
-        response = supabase.auth.sign_in_with_password({
+        client = await get_supabase()
+        response = await client.auth.sign_in_with_password({
             "email": credentials.email,
             "password": credentials.password
         })
@@ -82,7 +111,8 @@ async def login(credentials: UserLogin):
 @router.post("/logout")
 async def logout():
     try:
-        supabase.auth.sign_out()
+        client = await get_supabase()
+        await client.auth.sign_out()
         return {"message": "Successfully logged out"}
     except Exception as e:
         raise HTTPException(
@@ -95,7 +125,8 @@ async def logout():
 @router.get("/profile")
 async def get_profile(token: str = Depends(oauth2_scheme)):
     try:
-        user = supabase.auth.get_user(token)
+        client = await get_supabase()
+        user = await client.auth.get_user(token)
         if not user:
             raise HTTPException(status_code=401, detail="Invalid token")
         
@@ -1,15 +1,23 @@
 from fastapi import APIRouter, HTTPException
 from app.models.contact import ContactCreate
-from app.config.config import supabase_client
+from app.config.config import supabase_client, settings
+from app.services.contact_queue import ContactQueue
 from datetime import datetime
 from fastapi.responses import JSONResponse
 
 contact_router = APIRouter(prefix="/contact", tags=["contact"])
+contact_queue = ContactQueue(
+    supabase_client,
+    spill_path=settings.CONTACT_SPILL_PATH,
+    batch_size=settings.CONTACT_BATCH_SIZE,
+    flush_interval=settings.CONTACT_FLUSH_INTERVAL
+)
 
 @contact_router.post("", response_class=JSONResponse)
 async def create_contact(contact: ContactCreate):
    """
    Create a new contact message without requiring authentication.
+   The message is queued and written to Supabase in the next batch.
    """
    try:
        new_contact = {
@@ -19,20 +27,20 @@ async def create_contact(contact: ContactCreate):
            "created_at": datetime.utcnow().isoformat()
        }
        
-       # Insert into Supabase
-       response = supabase_client.table("contacts").insert(new_contact).execute()
-       
-       if not response.data:
-           raise HTTPException(status_code=400, detail="Failed to create contact message")
+       # Acknowledge now; the queue writes it in the next batched insert
+       if not contact_queue.submit(new_contact):
+           raise HTTPException(status_code=409, detail="This message was already sent")
            
        return JSONResponse(
            status_code=200,
            content={
                "message": "Contact message sent successfully",
-               "contact": response.data[0]
+               "contact": new_contact
            }
        )
        
+   except HTTPException:
+       raise
    except Exception as e:
        raise HTTPException(
            status_code=400,
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.dependencies import require_debug_token
+from app.routes.auth import auth_executor
+from app.tracing import trace_recorder
+from app.profiler import request_profiler
+from app.loop_monitor import loop_monitor
+from app.services.resilience import upstreams
+
+debug_router = APIRouter(
+    prefix="/debug",
+    tags=["debug"],
+    dependencies=[Depends(require_debug_token)],
+    include_in_schema=False
+)
+
+@debug_router.get("/executors")
+async def get_executor_stats():
+    """
+    Queue depth and latency for the thread pools used by async routes.
+    """
+    return [auth_executor.stats()]
+
+@debug_router.get("/traces")
+async def get_recent_traces(limit: int = Query(50, gt=0, le=500)):
+    """
+    Most recent sampled request traces, newest first.
+    """
+    return trace_recorder.recent(limit)
+
+@debug_router.get("/traces/{request_id}")
+async def get_trace(request_id: str):
+    """
+    Span breakdown for a single sampled request.
+    """
+    trace = trace_recorder.find(request_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found or not sampled")
+    return trace
+
+@debug_router.get("/profiles")
+async def get_profiles():
+    """
+    Captured request profiles, newest first.
+    """
+    return request_profiler.list_profiles()
+
+@debug_router.get("/profiles/{request_id}", response_class=PlainTextResponse)
+async def get_profile(request_id: str):
+    """
+    Collapsed-stack profile for one request, ready for flamegraph.pl or speedscope.
+    """
+    profile = request_profiler.read_profile(request_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+@debug_router.get("/upstreams")
+async def get_upstream_stats():
+    """
+    Circuit breaker state, latency percentiles and retry/hedge counts per upstream API.
+    """
+    return [upstream.stats() for upstream in upstreams]
+
+@debug_router.get("/loop")
+async def get_loop_report(limit: int = Query(20, gt=0, le=200)):
+    """
+    Event-loop lag histogram and the call sites that blocked the loop longest.
+    """
+    return loop_monitor.report(limit)
@@ -1,19 +1,41 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi import APIRouter, HTTPException, Depends, Header, BackgroundTasks, Response
 from fastapi.responses import StreamingResponse
 from app.models.itinerary import Itinerary
-from app.services.openai_service import OpenAIService
+from app.services.openai_service import openai_service
 from app.services.pdf_service import PDFService
+from app.services.route_service import RouteService
+from app.services.itinerary_parser import ItineraryParser
+from app.services.draft_service import DraftItineraryService
+from app.services.idempotency import IdempotencyStore
+from app.services.blob_store import ItineraryBlobStore
+from app.services.forecast_refresher import forecast_refresher
 from app.utils import get_park_data, get_weather_data
-from app.models.itinerary_request import UserPreferences
-from app.config.config import supabase_client
-from app.dependencies import get_current_user
-from datetime import datetime
+from app.models.itinerary_request import UserPreferences, RoadTripPreferences
+from app.models.park import Park
+from app.config.config import supabase_client, settings, engine
+from app.dependencies import get_current_user, get_db
+from app.tracing import span
+from datetime import datetime, timedelta
 from pydantic import BaseModel
+from sqlmodel import Session, select
+from postgrest import SyncPostgrestClient
 from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
 
 itineraries_router = APIRouter(prefix="/itineraries", tags=["itineraries"])
-openai_service = OpenAIService()
 pdf_service = PDFService()
+route_service = RouteService()
+itinerary_parser = ItineraryParser()
+draft_service = DraftItineraryService()
+idempotency_store = IdempotencyStore(
+    settings.IDEMPOTENCY_TTL_SECONDS,
+    settings.IDEMPOTENCY_MAX_KEYS,
+    engine=engine,
+    lock_timeout=settings.IDEMPOTENCY_LOCK_SECONDS
+)
+blob_store = ItineraryBlobStore(supabase_client, settings.BLOB_CACHE_SIZE)
 
 class ItineraryCreate(BaseModel):
     title: str
@@ -38,48 +60,214 @@ async def get_user_itineraries(current_user: str = Depends(get_current_user)):
         if not response.data:
             raise HTTPException(status_code=404, detail="No itineraries found")
 
-        return response.data
+        return blob_store.hydrate(response.data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def user_postgrest(token: Optional[str]) -> SyncPostgrestClient:
+    """
+    PostgREST client authenticated as one user. Work that outlives the request
+    can't use supabase_client, whose token is whatever the latest request set.
+    """
+    headers = dict(supabase_client.options.headers)
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return SyncPostgrestClient(supabase_client.rest_url, headers=headers)
+
+async def replace_draft(
+    itinerary_id: int,
+    user_id: str,
+    token: Optional[str],
+    park_name: str,
+    preferences: dict,
+    weather_data: dict
+):
+    """Generate the GPT itinerary and overwrite the draft stored for `itinerary_id`."""
+    try:
+        itinerary_text = await openai_service.generate_detailed_itinerary(park_name, preferences, weather_data)
+        with user_postgrest(token) as client:
+            result = client.table("itineraries").update(
+                blob_store.body_fields(itinerary_text, itinerary_parser.parse(itinerary_text))
+            ).eq("id", itinerary_id).eq("user_id", user_id).execute()
+        if not result.data:
+            # Deleted meanwhile, or not visible to this user under RLS
+            logger.error("Draft itinerary %s was not replaced: no row matched", itinerary_id)
+            return
+        logger.info("Replaced draft itinerary %s", itinerary_id)
+    except Exception as e:
+        # The draft stays in place as a usable itinerary
+        logger.error("Failed to replace draft itinerary %s: %s", itinerary_id, e)
+
 @itineraries_router.post("", response_model=Itinerary)
 async def create_itinerary(
     user_preferences: UserPreferences,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    draft: bool = False,
     current_user: str = Depends(get_current_user),
-    authorization: str = Header(None)
+    authorization: str = Header(None),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    Create an itinerary. With `draft=true` a template itinerary is stored and
+    returned immediately (X-Itinerary-Status: draft) and replaced in place by
+    the GPT version once it has been generated.
+    Retries sent with the same Idempotency-Key attach to the original request
+    or get its stored result instead of generating and inserting again.
+    """
+    token = None
+    if authorization and authorization.startswith('Bearer '):
+        token = authorization.split(' ')[1]
+        supabase_client.postgrest.auth(token)
+
+    return await idempotency_store.run(
+        current_user,
+        idempotency_key,
+        idempotency_store.fingerprint("create_itinerary", {"preferences": user_preferences.model_dump(mode="json"), "draft": draft}),
+        lambda: _create_itinerary(user_preferences, draft, current_user, token, background_tasks, response),
+        response
+    )
+
+async def _create_itinerary(
+    user_preferences: UserPreferences,
+    draft: bool,
+    current_user: str,
+    token: Optional[str],
+    background_tasks: BackgroundTasks,
+    response: Response
 ):
     try:
-        if authorization and authorization.startswith('Bearer '):
-            token = authorization.split(' ')[1]
-            supabase_client.postgrest.auth(token)
+        with span("park"):
+            park_data = get_park_data(user_preferences.parkcode)
+        logger.info("Park data retrieved for %s", park_data["parkcode"])
+        logger.debug("Park data: %s", park_data)
         
-        park_data = get_park_data(user_preferences.parkcode)
-        print(f"Park data retrieved: {park_data}")
+        # Pre-warmed forecast; never wait on the weather API here
+        with span("weather"):
+            weather_data = forecast_refresher.get(park_data["parkcode"]) or get_weather_data(park_data["location"])
+        logger.debug("Weather data: %s", weather_data)
         
-        weather_data = get_weather_data(park_data["location"])
-        print(f"Weather data retrieved: {weather_data}")
-        
-        itinerary_text = await openai_service.generate_detailed_itinerary(
-            park_data['name'],
-            user_preferences.dict(),
-            weather_data
-        )
+        if draft:
+            with span("draft"):
+                itinerary_text = draft_service.generate(park_data['name'], user_preferences.dict(), weather_data)
+        else:
+            with span("openai"):
+                itinerary_text = await openai_service.generate_detailed_itinerary(
+                    park_data['name'],
+                    user_preferences.dict(),
+                    weather_data
+                )
 
         new_itinerary = {
             "user_id": current_user,
             "title": f"{park_data['name']} Trip",
             "start_date": user_preferences.start_date.isoformat(),
             "end_date": user_preferences.end_date.isoformat(),
-            "description": itinerary_text
+            **blob_store.body_fields(itinerary_text, itinerary_parser.parse(itinerary_text))
         }
 
-        response = supabase_client.table("itineraries").insert(new_itinerary).execute()
+        with span("insert"):
+            insert_response = supabase_client.table("itineraries").insert(new_itinerary).execute()
         
+        if not insert_response.data:
+            raise HTTPException(status_code=400, detail="Failed to create itinerary")
+
+        itinerary = blob_store.hydrate(insert_response.data)[0]
+        if draft:
+            background_tasks.add_task(
+                replace_draft, itinerary["id"], current_user, token, park_data['name'], user_preferences.dict(), weather_data
+            )
+            response.headers["X-Itinerary-Status"] = "draft"
+
+        return itinerary
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@itineraries_router.post("/road_trip")
+async def create_road_trip(
+    trip_preferences: RoadTripPreferences,
+    current_user: str = Depends(get_current_user),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    try:
+        if authorization and authorization.startswith('Bearer '):
+            token = authorization.split(' ')[1]
+            supabase_client.postgrest.auth(token)
+
+        parkcodes = list(dict.fromkeys(code.lower() for code in trip_preferences.parkcodes))
+        # Row order from the IN query is arbitrary; the route starts at the first park requested
+        parks = sorted(
+            db.exec(select(Park).where(Park.parkcode.in_(parkcodes))).all(),
+            key=lambda park: parkcodes.index(park.parkcode)
+        )
+
+        found = {park.parkcode for park in parks}
+        missing = [code for code in parkcodes if code not in found]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Parks not found: {', '.join(missing)}")
+
+        stops = route_service.plan_trip(
+            [
+                {
+                    "id": park.id,
+                    "name": park.name,
+                    "parkcode": park.parkcode,
+                    "latitude": park.latitude if park.latitude is not None else (park.location or {}).get("lat"),
+                    "longitude": park.longitude if park.longitude is not None else (park.location or {}).get("lng")
+                }
+                for park in parks
+            ],
+            trip_preferences.num_days
+        )
+
+        end_date = trip_preferences.start_date + timedelta(days=trip_preferences.num_days - 1)
+        description = "\n".join(
+            f"📅 Day {stop['day_number']}"
+            + (f"-{stop['day_number'] + stop['num_days'] - 1}" if stop['num_days'] > 1 else "")
+            + f": {stop['name']}"
+            + (f" ({stop['miles_from_previous']} miles from previous stop)" if stop['miles_from_previous'] else "")
+            for stop in stops
+        )
+
+        new_itinerary = {
+            "user_id": current_user,
+            "title": trip_preferences.title or f"{len(stops)} Park Road Trip",
+            "start_date": trip_preferences.start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            **blob_store.body_fields(description, itinerary_parser.parse(description))
+        }
+
+        response = supabase_client.table("itineraries").insert(new_itinerary).execute()
+
         if not response.data:
             raise HTTPException(status_code=400, detail="Failed to create itinerary")
-            
-        return response.data[0]
 
+        itinerary = blob_store.hydrate(response.data)[0]
+
+        # Single bulk insert for every stop on the route
+        try:
+            stops_response = supabase_client.table("itinerary_parks").insert([
+                {
+                    "itinerary_id": itinerary["id"],
+                    "park_id": stop["park_id"],
+                    "day_number": stop["day_number"],
+                    "notes": f"{stop['num_days']} day(s), {stop['miles_from_previous']} miles from previous stop"
+                }
+                for stop in stops
+            ]).execute()
+            if len(stops_response.data or []) != len(stops):
+                raise HTTPException(status_code=400, detail="Failed to save road trip stops")
+        except Exception:
+            # Don't leave an itinerary without its stops behind
+            supabase_client.table("itineraries").delete().eq("id", itinerary["id"]).execute()
+            raise
+
+        return {"itinerary": itinerary, "stops": stops}
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -94,7 +282,8 @@ async def get_itinerary_pdf(
             token = authorization.split(' ')[1]
             supabase_client.postgrest.auth(token)
         
-        response = supabase_client.table("itineraries").select("*").eq("id", itinerary_id).execute()
+        with span("fetch"):
+            response = supabase_client.table("itineraries").select("*").eq("id", itinerary_id).execute()
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Itinerary not found")
@@ -104,7 +293,11 @@ async def get_itinerary_pdf(
         if itinerary['user_id'] != current_user:
             raise HTTPException(status_code=403, detail="Not authorized to access this itinerary")
         
-        pdf_buffer = pdf_service.generate_itinerary_pdf(itinerary)
+        with span("blob"):
+            blob_store.hydrate([itinerary])
+
+        with span("render"):
+            pdf_buffer = pdf_service.generate_itinerary_pdf(itinerary)
         
         return StreamingResponse(
             pdf_buffer,
@@ -114,14 +307,25 @@ async def get_itinerary_pdf(
             }
         )
     except Exception as e:
-        print(f"PDF generation error: {str(e)}")
+        logger.error("PDF generation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 @itineraries_router.post("/save_itinerary")
 async def save_itinerary(
     itinerary_id: int,
-    current_user: str = Depends(get_current_user)
+    response: Response,
+    current_user: str = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
+    return await idempotency_store.run(
+        current_user,
+        idempotency_key,
+        idempotency_store.fingerprint("save_itinerary", {"itinerary_id": itinerary_id}),
+        lambda: _save_itinerary(itinerary_id, current_user),
+        response
+    )
+
+async def _save_itinerary(itinerary_id: int, current_user: str):
     try:
         response = supabase_client.table("itineraries").select("*").eq("id", itinerary_id).execute()
         
@@ -138,42 +342,63 @@ async def save_itinerary(
             "title": itinerary['title'],
             "start_date": itinerary['start_date'],
             "end_date": itinerary['end_date'],
-            "description": itinerary['description']
+            "description_hash": None,
+            "description": None,
+            "day_plan": None
         }
+        source = blob_store.hydrate([itinerary])[0]
+        if source.get('description') is not None:
+            # Saved copies share the original's blob; putting it again refreshes
+            # last_referenced_at so garbage collection can't drop it under the new row
+            new_itinerary.update(blob_store.body_fields(
+                source['description'],
+                source.get('day_plan') or itinerary_parser.parse(source['description'])
+            ))
 
         response = supabase_client.table("itineraries").insert(new_itinerary).execute()
         
         if not response.data:
             raise HTTPException(status_code=400, detail="Failed to save itinerary")
         
-        return {"message": "Itinerary saved to your profile successfully", "itinerary": response.data[0]}
+        return {"message": "Itinerary saved to your profile successfully", "itinerary": blob_store.hydrate(response.data)[0]}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @itineraries_router.post("/save_new_itinerary")
 async def save_new_itinerary(
     itinerary: ItineraryCreate,
+    response: Response,
     current_user: str = Depends(get_current_user),
-    authorization: str = Header(None)
+    authorization: str = Header(None),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
+    if authorization and authorization.startswith('Bearer '):
+        token = authorization.split(' ')[1]
+        supabase_client.postgrest.auth(token)
+
+    return await idempotency_store.run(
+        current_user,
+        idempotency_key,
+        idempotency_store.fingerprint("save_new_itinerary", itinerary.model_dump(mode="json")),
+        lambda: _save_new_itinerary(itinerary, current_user),
+        response
+    )
+
+async def _save_new_itinerary(itinerary: ItineraryCreate, current_user: str):
     try:
-        if authorization and authorization.startswith('Bearer '):
-            token = authorization.split(' ')[1]
-            supabase_client.postgrest.auth(token)
-        
         new_itinerary = {
             "user_id": current_user,
             "title": itinerary.title,
             "start_date": itinerary.start_date,
             "end_date": itinerary.end_date,
-            "description": itinerary.description
+            **blob_store.body_fields(itinerary.description, itinerary_parser.parse(itinerary.description))
         }
         
         response = supabase_client.table("itineraries").insert(new_itinerary).execute()
         
-        return {"message": "Itinerary saved successfully", "itinerary": response.data[0]}
+        return {"message": "Itinerary saved successfully", "itinerary": blob_store.hydrate(response.data)[0]}
     except Exception as e:
-        print("Error saving itinerary:", str(e))
+        logger.error("Error saving itinerary: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 @itineraries_router.delete("/{itinerary_id}")
@@ -223,11 +448,12 @@ async def update_itinerary(
         if itinerary['user_id'] != current_user:
             raise HTTPException(status_code=403, detail="Not authorized to edit this itinerary")
         
+        # Copy-on-write: the edit gets its own blob, other saved copies keep theirs
         update_response = supabase_client.table("itineraries").update({
             "title": itinerary_update.title,
-            "description": itinerary_update.description
+            **blob_store.body_fields(itinerary_update.description, itinerary_parser.parse(itinerary_update.description))
         }).eq("id", itinerary_id).execute()
         
-        return {"message": "Itinerary updated successfully", "itinerary": update_response.data[0]}
+        return {"message": "Itinerary updated successfully", "itinerary": blob_store.hydrate(update_response.data)[0]}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
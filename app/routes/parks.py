@@ -1,33 +1,200 @@
 from fastapi import APIRouter, HTTPException, Depends, Query, status
 from sqlmodel import Session, select, or_  # Add or_ import
-from app.models.park import Park
+from app.models.park import Park, ParkPartial
 from app.dependencies import get_db, get_current_user
-from typing import List
+from app.services.park_catalog import park_catalog
+from app.services.similarity_service import ParkSimilarityIndex
+from app.services.activity_index import ParkActivityIndex, load_park_activities, SEASONS
+from app.services.nps_service import NPSService
+from app.services.weather_service import WeatherService
+from app.services.openai_service import openai_service
+from app.services.forecast_refresher import forecast_refresher
+from app.config.config import engine, settings
+from app.tracing import span
+from pydantic import BaseModel, Field
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
 import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/parks", tags=["parks"])
 
-@router.get("", response_model=List[Park])
+def _load_parks_for_index() -> List[dict]:
+    parks = park_catalog.all()
+    if parks is not None:
+        return parks
+    with Session(engine) as session:
+        activities = load_park_activities(session)
+        return [
+            {**park.model_dump(mode="json"), "activities": activities.get(str(park.id), [])}
+            for park in session.exec(select(Park)).all()
+        ]
+
+similarity_index = ParkSimilarityIndex(_load_parks_for_index, lambda: park_catalog.generation)
+activity_index = ParkActivityIndex(_load_parks_for_index, lambda: park_catalog.generation)
+nps_service = NPSService()
+weather_service = WeatherService()
+
+# Per-section deadlines (seconds) for the park overview fan-out
+OVERVIEW_DEADLINES = {
+    "details": 3.0,
+    "weather": 2.0,
+    "similar": 1.0,
+    "activity_tips": 5.0
+}
+# Generated activity tips per (parkcode, season), and generations still running
+_activity_tips: Dict[tuple, str] = {}
+_activity_tips_pending: Dict[tuple, asyncio.Task] = {}
+
+class ParkFacetResponse(BaseModel):
+    """Filtered park list with facet counts over every matching park."""
+    total: int
+    parks: List[ParkPartial]
+    facets: Dict[str, Dict[str, int]]
+
+class ParkRecommendationRequest(BaseModel):
+    preferred_activities: List[str]
+    fitness_level: str
+    limit: int = Field(default=5, gt=0, le=63)
+
+PARK_FIELDS = list(Park.model_fields)
+FIELDS_DESCRIPTION = f"Comma-separated fields to return, from: {', '.join(PARK_FIELDS)}"
+MAX_BATCH_CODES = 100
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in PARK_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return requested
+
+def _park_query(fields: Optional[List[str]]):
+    # Only select the requested columns so unused text never leaves the database
+    if fields is None:
+        return select(Park)
+    return select(*[getattr(Park, field) for field in fields])
+
+def _to_dicts(rows, fields: Optional[List[str]]) -> List[dict]:
+    if fields is None:
+        return [row.model_dump() for row in rows]
+    if len(fields) == 1:
+        return [{fields[0]: row} for row in rows]
+    return [dict(zip(fields, row)) for row in rows]
+
+def _project(parks: List[dict], fields: Optional[List[str]]) -> List[dict]:
+    if fields is None:
+        return parks
+    return [{field: park.get(field) for field in fields} for park in parks]
+
+@router.get("", response_model=List[ParkPartial], response_model_exclude_unset=True)
 async def get_parks(
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """
     Get a list of parks with pagination.
+    Example: /parks?fields=name,parkcode,latitude,longitude
     """
+    selected = _parse_fields(fields)
     try:
-        query = select(Park).offset(skip).limit(limit)
-        parks = db.exec(query).all()
-        logging.info(f"Retrieved {len(parks)} parks")
+        with span("query"):
+            catalog = park_catalog.all()
+            if catalog is not None:
+                parks = _project(catalog[skip:skip + limit], selected)
+            else:
+                query = _park_query(selected).offset(skip).limit(limit)
+                parks = _to_dicts(db.exec(query).all(), selected)
+        logger.info("Retrieved %d parks", len(parks))
         return parks
     except Exception as e:
-        logging.error(f"Error retrieving parks: {str(e)}")
+        logger.error("Error retrieving parks: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
             detail=str(e)
         )
 
+@router.get("/filter", response_model=ParkFacetResponse, response_model_exclude_unset=True)
+async def filter_parks(
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    activities: Optional[str] = Query(None, description="Comma-separated NPS activities, e.g. hiking,camping"),
+    season: Optional[str] = Query(None, pattern=f"^({'|'.join(SEASONS)})$"),
+    match: str = Query("all", pattern="^(all|any)$", description="Require all activities or any of them"),
+):
+    """
+    Filter parks by activities and/or season through the activity index.
+    Facets count every activity and season among all matching parks, not
+    just the returned page. Without filters every park matches.
+    Example: /parks/filter?activities=hiking,camping&season=winter&match=all
+    """
+    selected = _parse_fields(fields)
+    requested = [name.strip() for name in (activities or "").split(",") if name.strip()]
+    try:
+        with span("index"):
+            matches, facets = activity_index.query(requested, season, match)
+        logger.info("Matched %d parks for activities=%s season=%s", len(matches), requested, season)
+        return {
+            "total": len(matches),
+            "parks": _project(matches[skip:skip + limit], selected),
+            "facets": facets
+        }
+    except Exception as e:
+        logger.error("Error filtering parks: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/batch", response_model=List[ParkPartial], response_model_exclude_unset=True)
+async def get_parks_batch(
+    codes: str = Query(..., description="Comma-separated parkcodes, e.g. yose,zion,grca"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
+    """
+    Get several parks by parkcode in one request, in the order requested.
+    Unknown codes are skipped.
+    Example: /parks/batch?codes=yose,zion&fields=name,parkcode
+    """
+    selected = _parse_fields(fields)
+    parkcodes = list(dict.fromkeys(code.strip().lower() for code in codes.split(",") if code.strip()))
+    if len(parkcodes) > MAX_BATCH_CODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_CODES} parkcodes per request"
+        )
+    # parkcode is needed to put results back in request order
+    query_fields = selected if selected is None or "parkcode" in selected else selected + ["parkcode"]
+
+    try:
+        with span("query"):
+            if park_catalog.available:
+                found = [park for park in (park_catalog.get(code) for code in parkcodes) if park]
+            else:
+                query = _park_query(query_fields).where(Park.parkcode.in_(parkcodes))
+                found = _to_dicts(db.exec(query).all(), query_fields)
+
+        by_code = {park["parkcode"]: park for park in found}
+        parks = _project([by_code[code] for code in parkcodes if code in by_code], selected)
+        logger.info("Retrieved %d of %d requested parks", len(parks), len(parkcodes))
+        return parks
+    except Exception as e:
+        logger.error("Error retrieving park batch: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
 @router.get("/parkcode/{parkcode}", response_model=Park)
 async def get_park_by_parkcode(
     parkcode: str,
@@ -38,8 +205,12 @@ async def get_park_by_parkcode(
     Example: /api/v1/parks/parkcode/yose (for Yosemite)
     """
     try:
-        query = select(Park).where(Park.parkcode == parkcode.lower())
-        park = db.exec(query).first()
+        with span("query"):
+            if park_catalog.available:
+                park = park_catalog.get(parkcode.lower())
+            else:
+                query = select(Park).where(Park.parkcode == parkcode.lower())
+                park = db.exec(query).first()
         
         if not park:
             raise HTTPException(
@@ -47,19 +218,20 @@ async def get_park_by_parkcode(
                 detail=f"Park with code '{parkcode}' not found"
             )
             
-        logging.info(f"Retrieved park details for {parkcode}")
+        logger.info("Retrieved park details for %s", parkcode)
         return park
         
     except Exception as e:
-        logging.error(f"Error retrieving park with code {parkcode}: {str(e)}")
+        logger.error("Error retrieving park with code %s: %s", parkcode, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving park: {str(e)}"
         )
 
-@router.get("/search", response_model=List[Park])
+@router.get("/search", response_model=List[ParkPartial], response_model_exclude_unset=True)
 async def search_parks(
     q: str = Query(None, description="Search parks by name or description"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """
@@ -67,25 +239,176 @@ async def search_parks(
     Examples: 
     - /parks/search?q=Yosemite
     - /parks/search?q=Canyon
-    - /parks/search?q=wilderness
+    - /parks/search?q=wilderness&fields=name,parkcode
     """
+    selected = _parse_fields(fields)
     try:
-        query = select(Park)
-        if q:
-            # Search in both name and description fields
-            query = query.where(
-                or_(
-                    Park.name.ilike(f"%{q}%"),
-                    Park.description.ilike(f"%{q}%")
-                )
-            )
-        
-        parks = db.exec(query).all()
-        logging.info(f"Found {len(parks)} parks matching search term '{q}'")
+        with span("query"):
+            catalog = park_catalog.all()
+            if catalog is not None:
+                term = (q or "").lower()
+                parks = _project([
+                    park for park in catalog
+                    if term in park["name"].lower() or term in park["description"].lower()
+                ], selected)
+            else:
+                query = _park_query(selected)
+                if q:
+                    # Search in both name and description fields
+                    query = query.where(
+                        or_(
+                            Park.name.ilike(f"%{q}%"),
+                            Park.description.ilike(f"%{q}%")
+                        )
+                    )
+                
+                parks = _to_dicts(db.exec(query).all(), selected)
+        logger.info("Found %d parks matching search term '%s'", len(parks), q)
         return parks
     except Exception as e:
-        logging.error(f"Error searching parks: {str(e)}")
+        logger.error("Error searching parks: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/{parkcode}/similar")
+async def get_similar_parks(
+    parkcode: str,
+    limit: int = Query(5, gt=0, le=63)
+):
+    """
+    Get parks similar to the given park, ranked by description and activity overlap.
+    Example: /parks/yose/similar?limit=3
+    """
+    try:
+        with span("similarity"):
+            similar = similarity_index.similar(parkcode.lower(), limit)
+    except Exception as e:
+        logger.error("Error finding parks similar to %s: %s", parkcode, e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+    if similar is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Park with code '{parkcode}' not found"
+        )
+    return similar
+
+@router.post("/recommend")
+async def recommend_parks(preferences: ParkRecommendationRequest):
+    """
+    Recommend parks matching a user's preferred activities and fitness level.
+    """
+    try:
+        with span("similarity"):
+            return similarity_index.recommend(
+                preferences.preferred_activities,
+                preferences.fitness_level,
+                preferences.limit
+            )
+    except Exception as e:
+        logger.error("Error recommending parks: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+
+async def _run_section(name: str, load: Callable[[], Awaitable], deadline: float) -> Dict:
+    """Run one overview branch under its deadline and report how it went instead of raising."""
+    started = time.perf_counter()
+    try:
+        with span(name):
+            data = await asyncio.wait_for(load(), deadline)
+        result = {"status": "ok" if data is not None else "unavailable", "data": data}
+    except asyncio.TimeoutError:
+        result = {"status": "timeout", "data": None}
+    except Exception as e:
+        logger.warning("Park overview section %s failed: %s", name, e)
+        result = {"status": "error", "data": None, "error": getattr(e, "detail", None) or str(e)}
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+async def _overview_weather(park: dict) -> Optional[dict]:
+    # Pre-warmed forecast first; the live call also falls back to the last good response
+    stored = forecast_refresher.get(park["parkcode"])
+    if stored is not None:
+        return stored
+    if not settings.WEATHER_API_KEY:
+        return None
+    location = park.get("location") or {}
+    latitude = park.get("latitude") if park.get("latitude") is not None else location.get("lat")
+    longitude = park.get("longitude") if park.get("longitude") is not None else location.get("lng")
+    if latitude is None or longitude is None:
+        return None
+    return weather_service.summarize_forecast(await weather_service.get_weather(latitude, longitude))
+
+async def _overview_activity_tips(park: dict, season: str) -> str:
+    key = (park["parkcode"], season)
+    if key in _activity_tips:
+        return _activity_tips[key]
+    task = _activity_tips_pending.get(key)
+    if task is None:
+        async def generate():
+            try:
+                _activity_tips[key] = await openai_service.generate_activity_recommendations(park, season)
+                return _activity_tips[key]
+            finally:
+                _activity_tips_pending.pop(key, None)
+        task = _activity_tips_pending[key] = asyncio.create_task(generate())
+        # Nobody may be awaiting it any more; mark a failure as seen
+        task.add_done_callback(lambda finished: finished.cancelled() or finished.exception())
+    # A missed deadline doesn't cancel the generation; the next overview gets the cached tips
+    return await asyncio.shield(task)
+
+@router.get("/{parkcode}/overview")
+async def get_park_overview(
+    parkcode: str,
+    season: Optional[str] = Query(None, pattern=f"^({'|'.join(SEASONS)})$", description="Also include generated activity tips for this season"),
+    db: Session = Depends(get_db)
+):
+    """
+    Everything a park page needs in one call. NPS details, weather, similar
+    parks and (with `season`) activity tips are fetched concurrently, each
+    under its own deadline, so the response takes as long as the slowest
+    allowed section rather than the sum of them. Every section reports a
+    status of ok, unavailable, timeout or error, with whatever data arrived.
+    Example: /parks/yose/overview?season=winter
+    """
+    code = parkcode.lower()
+    with span("query"):
+        if park_catalog.available:
+            park = park_catalog.get(code)
+        else:
+            found = db.exec(select(Park).where(Park.parkcode == code)).first()
+            park = found.model_dump(mode="json") if found else None
+    if not park:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Park with code '{parkcode}' not found"
+        )
+
+    branches = {
+        "details": lambda: nps_service.get_park_details(code),
+        "weather": lambda: _overview_weather(park),
+        # Runs in a thread so a cold index build can't hold up the other sections
+        "similar": lambda: asyncio.to_thread(similarity_index.similar, code, 5)
+    }
+    if season:
+        branches["activity_tips"] = lambda: _overview_activity_tips(park, season)
+
+    results = await asyncio.gather(*(
+        _run_section(name, load, OVERVIEW_DEADLINES[name]) for name, load in branches.items()
+    ))
+    sections = dict(zip(branches, results))
+    logger.info(
+        "Park overview for %s: %s", code,
+        ", ".join(f"{name}={section['status']}" for name, section in sections.items())
+    )
+    return {
+        "park": ParkPartial.model_validate(park).model_dump(mode="json"),
+        "sections": sections
+    }
@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from sqlmodel import Session, select
+from app.models.park import ParkActivity
+
+SEASONS = ("spring", "summer", "fall", "winter")
+
+# NPS activity keywords that make a park a good fit for each season
+SEASON_KEYWORDS = {
+    "spring": ("hiking", "birdwatching", "wildlife watching", "fishing", "horseback", "biking", "wildflower"),
+    "summer": ("swimming", "paddling", "kayaking", "canoeing", "boating", "rafting", "tubing", "snorkeling",
+               "scuba", "surfing", "camping", "backpacking"),
+    "fall": ("hiking", "biking", "wildlife watching", "birdwatching", "fishing", "scenic driving", "horseback",
+             "hunting"),
+    "winter": ("skiing", "snowshoe", "snowmobil", "sledding", "snow play", "ice skating", "ice fishing",
+               "ice climbing")
+}
+# Desert and tropical parks south of this latitude are at their best in winter
+WARM_WINTER_LATITUDE = 35.0
+
+def load_park_activities(session: Session) -> Dict[str, List[str]]:
+    """Activity names per park id, from the park_activities table."""
+    activities = defaultdict(list)
+    for row in session.exec(select(ParkActivity).order_by(ParkActivity.activity)).all():
+        activities[str(row.park_id)].append(row.activity)
+    return dict(activities)
+
+def _bit_positions(bits: int):
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+class _IndexState(NamedTuple):
+    """One generation of the bitsets, swapped in as a whole."""
+    parks: List[Dict]
+    activities: Dict[str, int]
+    seasons: Dict[str, int]
+
+class ParkActivityIndex:
+    """
+    Bitmap index over the park catalog: one bitset per activity and per
+    season, with bit i standing for the i-th park. Filters are answered with
+    bitwise AND/OR over a handful of integers rather than by scanning parks,
+    and facet counts are popcounts of each activity's bitset against the result.
+    A rebuild replaces the parks and their bitsets in a single assignment, so
+    a query never mixes bit positions from two generations.
+    """
+
+    def __init__(self, loader: Callable[[], List[Dict]], version: Callable[[], Optional[int]], ttl: float = 300.0):
+        """
+        Args:
+            loader: Returns the current list of parks, each with an `activities` list
+            version: Cheap check for the park source's version. When it returns
+                     None the parks are reloaded every `ttl` seconds instead.
+            ttl (float): Reload interval for sources without a version
+        """
+        self.loader = loader
+        self.version = version
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0.0
+        self._loaded = False
+        self._state = _IndexState([], {}, dict.fromkeys(SEASONS, 0))
+
+    def _is_current(self, version: Optional[int]) -> bool:
+        if not self._loaded:
+            return False
+        if version is not None:
+            return version == self._version
+        return time.monotonic() - self._loaded_at < self.ttl
+
+    def ensure_current(self) -> _IndexState:
+        """Rebuild the bitsets if the park source has changed, and return the current state."""
+        version = self.version()
+        if not self._is_current(version):
+            with self._lock:
+                # Another thread may have rebuilt it while we waited
+                if not self._is_current(version):
+                    self._state = self._build(self.loader())
+                    self._version = version
+                    self._loaded_at = time.monotonic()
+                    self._loaded = True
+        return self._state
+
+    def _build(self, parks: List[Dict]) -> _IndexState:
+        activities = defaultdict(int)
+        seasons = dict.fromkeys(SEASONS, 0)
+        for position, park in enumerate(parks):
+            bit = 1 << position
+            names = [name.lower() for name in park.get("activities") or []]
+            for name in names:
+                activities[name] |= bit
+            for season, keywords in SEASON_KEYWORDS.items():
+                if any(keyword in name for name in names for keyword in keywords):
+                    seasons[season] |= bit
+            latitude = park.get("latitude") if park.get("latitude") is not None else (park.get("location") or {}).get("lat")
+            if latitude is not None and latitude < WARM_WINTER_LATITUDE:
+                seasons["winter"] |= bit
+
+        return _IndexState(parks=parks, activities=dict(activities), seasons=seasons)
+
+    def query(self, activities: List[str], season: Optional[str] = None, match: str = "all") -> Tuple[List[Dict], Dict]:
+        """
+        Filter parks by activities and season.
+
+        Args:
+            activities (List[str]): Activity names (case-insensitive); empty means no activity filter
+            season (Optional[str]): One of SEASONS
+            match (str): "all" to require every activity, "any" for at least one
+
+        Returns:
+            Tuple[List[Dict], Dict]: Matching parks in catalog order, and facet
+                                     counts {"activities": {...}, "seasons": {...}}
+                                     over the matching parks
+        """
+        state = self.ensure_current()
+        result = (1 << len(state.parks)) - 1
+        if activities:
+            bitsets = [state.activities.get(name.lower(), 0) for name in activities]
+            if match == "any":
+                result = 0
+                for bits in bitsets:
+                    result |= bits
+            else:
+                for bits in bitsets:
+                    result &= bits
+        if season:
+            result &= state.seasons.get(season, 0)
+
+        parks = [state.parks[position] for position in _bit_positions(result)]
+        activity_counts = {name: (bits & result).bit_count() for name, bits in state.activities.items()}
+        facets = {
+            "activities": dict(sorted(
+                ((name, count) for name, count in activity_counts.items() if count),
+                key=lambda item: (-item[1], item[0])
+            )),
+            "seasons": {name: (bits & result).bit_count() for name, bits in state.seasons.items()}
+        }
+        return parks, facets
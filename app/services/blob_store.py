@@ -0,0 +1,104 @@
+import base64
+import hashlib
+import json
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+from supabase import Client
+
+class ItineraryBlobStore:
+    """
+    Content-addressed storage for itinerary bodies.
+    Each distinct description is stored once in `itinerary_blobs`, keyed by its
+    sha256, together with its parsed day plan, zlib-compressed and base64
+    encoded. Itinerary rows hold only `description_hash`, so saving a shared
+    itinerary copies a 64-character reference and editing one writes a new
+    blob instead of changing the shared one. Recently used blobs are kept
+    decompressed in an LRU so list and PDF reads rarely touch the table; the
+    cache is never used to skip a write, because garbage collection may have
+    deleted a blob this process still remembers.
+    """
+
+    def __init__(self, client: Client, cache_size: int = 512):
+        self.client = client
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def digest(self, description: str) -> str:
+        return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+    def put(self, description: str, day_plan: Optional[Dict]) -> str:
+        """
+        Store a description and return its hash. Every call writes, so the blob
+        exists and its `last_referenced_at` is fresh when a row starts pointing at it.
+
+        Args:
+            description (str): Itinerary text
+            day_plan (Optional[Dict]): Day plan parsed from the text
+
+        Returns:
+            str: sha256 of the description, used as `description_hash`
+        """
+        blob_hash = self.digest(description)
+        payload = json.dumps({"description": description, "day_plan": day_plan}).encode("utf-8")
+        # created_at is left to the column default, so an existing blob keeps it
+        self.client.table("itinerary_blobs").upsert(
+            {
+                "hash": blob_hash,
+                "data": base64.b64encode(zlib.compress(payload, 9)).decode("ascii"),
+                "size": len(payload),
+                "last_referenced_at": datetime.now(timezone.utc).isoformat()
+            },
+            on_conflict="hash",
+            returning="minimal"
+        ).execute()
+        self._remember(blob_hash, {"description": description, "day_plan": day_plan})
+        return blob_hash
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Look up bodies by hash: cached ones first, the rest in a single query.
+
+        Returns:
+            Dict[str, Dict]: hash -> {"description", "day_plan"} for every hash found
+        """
+        found = {}
+        missing = []
+        for blob_hash in dict.fromkeys(hashes):
+            if blob_hash in self._cache:
+                self._cache.move_to_end(blob_hash)
+                found[blob_hash] = self._cache[blob_hash]
+            else:
+                missing.append(blob_hash)
+
+        if missing:
+            response = self.client.table("itinerary_blobs").select("hash, data").in_("hash", missing).execute()
+            for row in response.data:
+                body = json.loads(zlib.decompress(base64.b64decode(row["data"])))
+                self._remember(row["hash"], body)
+                found[row["hash"]] = body
+        return found
+
+    def hydrate(self, rows: List[Dict]) -> List[Dict]:
+        """
+        Fill in description and day_plan on itinerary rows that reference a blob.
+        Rows written before blobs existed keep their inline description.
+        """
+        bodies = self.get_many(row["description_hash"] for row in rows if row.get("description_hash"))
+        for row in rows:
+            body = bodies.get(row.get("description_hash"))
+            if body is not None:
+                row["description"] = body["description"]
+                row["day_plan"] = body["day_plan"]
+        return rows
+
+    def body_fields(self, description: str, day_plan: Optional[Dict]) -> Dict:
+        """Itinerary row fields referencing the stored body instead of inlining it."""
+        return {"description_hash": self.put(description, day_plan), "description": None, "day_plan": None}
+
+    def _remember(self, blob_hash: str, body: Dict):
+        self._cache[blob_hash] = body
+        self._cache.move_to_end(blob_hash)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
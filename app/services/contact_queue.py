@@ -0,0 +1,211 @@
+import asyncio
+import fcntl
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Dict, List, Optional
+from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+REPLAY_SUFFIX = ".replay"
+
+class ContactQueue:
+    """
+    Write-behind queue for contact form submissions.
+    Submissions are acknowledged immediately and flushed to Supabase in batched
+    inserts, either when the batch fills or when the flush interval elapses.
+    Batches that fail to insert are appended to a spill file and retried
+    on the next flush. Each process spills to its own `<spill_path>.<pid>`
+    file. A flush claims its own spill file, those of workers that have
+    exited, and `.replay` files left by a process that died mid-replay, by
+    renaming the file and holding an flock on it while it is replayed. Spill
+    files of live workers are left to their owner, which may be appending.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        spill_path: str,
+        batch_size: int = 50,
+        flush_interval: float = 2.0,
+        max_pending: int = 10000,
+        dedup_ttl: float = 3600.0
+    ):
+        self.client = client
+        self.spill_path = spill_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.dedup_ttl = dedup_ttl
+        self._pending: List[Dict] = []
+        self._seen: Dict[str, float] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, contact: Dict) -> bool:
+        """
+        Queue a contact for insertion.
+
+        Args:
+            contact (Dict): Row with name, email, message and created_at
+
+        Returns:
+            bool: False if an identical email+message was already queued recently
+        """
+        now = time.monotonic()
+        if len(self._seen) > self.max_pending:
+            self._seen = {key: seen for key, seen in self._seen.items() if now - seen < self.dedup_ttl}
+
+        key = self._dedup_key(contact)
+        seen = self._seen.get(key)
+        if seen is not None and now - seen < self.dedup_ttl:
+            return False
+        self._seen[key] = now
+
+        if len(self._pending) >= self.max_pending:
+            # Backlog is already as large as we are willing to hold in memory
+            self._spill([contact])
+            return True
+
+        self._pending.append(contact)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self):
+        """Start the background flush loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and drain everything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._pending:
+            await self.flush()
+
+    async def flush(self):
+        """Insert one batch of queued contacts, replaying any spilled rows first."""
+        async with self._flush_lock:
+            spill_paths = self._spill_paths()
+            if not self._pending and not spill_paths:
+                return
+
+            for path in spill_paths:
+                await self._replay_spill(path)
+
+            # Only dequeue once replay is over, so nothing it raises can drop the batch
+            batch = self._pending[:self.batch_size]
+            del self._pending[:len(batch)]
+
+            if batch:
+                try:
+                    await asyncio.to_thread(self._insert, batch)
+                except Exception as e:
+                    logger.error("Contact batch insert failed, spilling %d rows: %s", len(batch), e)
+                    self._spill(batch)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Contact queue flush failed: %s", e)
+
+    def _spill_paths(self) -> List[str]:
+        return sorted(path for path in glob.glob(glob.escape(self.spill_path) + "*") if self._claimable(path))
+
+    def _claimable(self, path: str) -> bool:
+        if path.endswith(REPLAY_SUFFIX):
+            return True
+        pid = path[len(self.spill_path) + 1:]
+        if not pid.isdigit() or int(pid) == os.getpid():
+            return True
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        # Its owner is alive and may be appending to it
+        return False
+
+    async def _replay_spill(self, path: str):
+        if path.endswith(REPLAY_SUFFIX):
+            replay_path = path
+        else:
+            # Renaming claims the file. It is ours or its writer has exited, and our
+            # own appends never interleave with this synchronous rename and read,
+            # so later spills land in a new file
+            replay_path = f"{path}.{uuid.uuid4().hex[:8]}{REPLAY_SUFFIX}"
+            try:
+                os.replace(path, replay_path)
+            except FileNotFoundError:
+                return
+
+        try:
+            replay_file = open(replay_path)
+        except FileNotFoundError:
+            return
+        with replay_file:
+            try:
+                fcntl.flock(replay_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another worker is replaying it
+                return
+            try:
+                if os.fstat(replay_file.fileno()).st_ino != os.stat(replay_path).st_ino:
+                    return
+            except FileNotFoundError:
+                # Replayed and removed while we waited for it
+                return
+
+            rows = []
+            for number, line in enumerate(replay_file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning("Skipping unreadable line %d in %s", number, replay_path)
+
+            sent = 0
+            try:
+                while sent < len(rows):
+                    await asyncio.to_thread(self._insert, rows[sent:sent + self.batch_size])
+                    sent += self.batch_size
+            except Exception as e:
+                logger.error("Replaying spilled contacts failed: %s", e)
+                self._spill(rows[sent:])
+            os.remove(replay_path)
+
+    def _insert(self, rows: List[Dict]):
+        self.client.table("contacts").insert(rows).execute()
+
+    def _spill(self, rows: List[Dict]):
+        if not rows:
+            return
+        # Per process; other workers only claim it once this process has exited
+        with open(f"{self.spill_path}.{os.getpid()}", "a") as spill_file:
+            for row in rows:
+                spill_file.write(json.dumps(row) + "\n")
+
+    def _dedup_key(self, contact: Dict) -> str:
+        payload = f"{contact['email'].strip().lower()}\n{contact['message'].strip()}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,142 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+# Trail distance ranges (miles) used in hiking suggestions, by fitness level
+TRAIL_DISTANCES = {
+    "easy": (1, 3),
+    "beginner": (1, 3),
+    "moderate": (3, 6),
+    "intermediate": (3, 6),
+    "strenuous": (6, 12),
+    "advanced": (6, 12)
+}
+
+# Morning / afternoon / evening suggestions per activity; {park} and {distance} are filled in
+ACTIVITY_TEMPLATES = {
+    "hiking": (
+        "Hike a {distance} trail from a main trailhead in {park}",
+        "Take a {distance} loop to a viewpoint recommended by the rangers",
+        "Short walk on a nature trail near your lodging"
+    ),
+    "camping": (
+        "Set up camp and walk the campground loop",
+        "Explore the area around your campsite",
+        "Campfire dinner and stargazing at camp"
+    ),
+    "photography": (
+        "Sunrise photography at a scenic overlook",
+        "Scout landscape and wildlife shots along the park road",
+        "Golden hour and sunset photography"
+    ),
+    "sightseeing": (
+        "Scenic drive with stops at the main overlooks",
+        "Visit the park's signature landmarks",
+        "Sunset at a popular viewpoint"
+    ),
+    "wildlife": (
+        "Early wildlife viewing while animals are most active",
+        "Ranger-led wildlife program",
+        "Dusk wildlife viewing along a quiet road"
+    ),
+    "fishing": (
+        "Morning fishing at a lake or river (check park regulations)",
+        "Fish a quieter stretch of water away from the crowds",
+        "Evening fishing as the water cools"
+    ),
+    "biking": (
+        "Ride a paved park road before traffic picks up",
+        "Bike a designated trail or scenic route",
+        "Easy evening ride near your lodging"
+    ),
+    "swimming": (
+        "Swim at a designated swimming area",
+        "Relax and swim at a lakeshore or beach",
+        "Sunset by the water"
+    ),
+    "stargazing": (
+        "Slow start after a late night outdoors",
+        "Ranger talk on the night sky",
+        "Stargazing at a dark-sky viewpoint"
+    )
+}
+
+DEFAULT_TEMPLATES = (
+    "Stop at the visitor center for maps and current conditions",
+    "Explore {park} at your own pace",
+    "Attend an evening ranger program"
+)
+
+class DraftItineraryService:
+    """
+    Builds a deterministic itinerary from park data and user preferences alone.
+    The output uses the same '📅 Day' / Morning / Afternoon / Evening format as
+    the GPT prompt, so it can be stored, parsed and rendered the same way while
+    the full itinerary is still being generated.
+    """
+
+    def generate(self, park_name: str, preferences: dict, weather_data: Optional[dict] = None) -> str:
+        """
+        Generate a template itinerary.
+
+        Args:
+            park_name (str): Name of the park
+            preferences (dict): User preferences including num_days, fitness_level and preferred_activities
+            weather_data (Optional[dict]): Weather summary; daily forecasts are noted on matching days
+
+        Returns:
+            str: Itinerary text in the daily format
+        """
+        activities = [activity.lower() for activity in preferences.get("preferred_activities") or []]
+        low, high = TRAIL_DISTANCES.get(str(preferences.get("fitness_level", "")).lower(), (2, 5))
+        forecast = self._forecast_by_date((weather_data or {}).get("days") or [])
+        start_date = self._as_date(preferences.get("start_date"))
+        is_camping = "camping" in activities
+
+        lines = []
+        for index in range(max(1, int(preferences.get("num_days") or 1))):
+            # Rotate the preferred activities so each day leads with a different one
+            rotated = activities[index % len(activities):] + activities[:index % len(activities)] if activities else []
+            templates = [ACTIVITY_TEMPLATES.get(activity, DEFAULT_TEMPLATES) for activity in rotated] or [DEFAULT_TEMPLATES]
+            primary = templates[0]
+            secondary = templates[1] if len(templates) > 1 else DEFAULT_TEMPLATES
+            # Step trail length up through the range over the trip
+            distance = f"{low + (high - low) * (index % 3) // 2}-mile"
+
+            title = f"{rotated[0].title()} in {park_name}" if rotated else f"Exploring {park_name}"
+            day_forecast = forecast.get(start_date + timedelta(days=index)) if start_date else None
+            if day_forecast:
+                title += f" ({day_forecast['conditions']}, high {day_forecast['high']}°F)"
+
+            lines.append(f"📅 Day {index + 1}: {title}")
+            for slot, name in enumerate(("Morning", "Afternoon", "Evening")):
+                lines.append("")
+                lines.append(f"{name}:")
+                for template in (primary[slot], secondary[slot]):
+                    lines.append(f"• {template.format(park=park_name, distance=distance)}")
+            lines.append("")
+            if is_camping:
+                lines.append(f"🏨 Recommended Campsite: Campground inside {park_name}")
+            else:
+                lines.append(f"🏨 Recommended Hotel: Lodging near {park_name}")
+            lines.append(f"🍽️ Recommended Restaurant: Dining near {park_name}")
+            lines.append("")
+            lines.append("---")
+            lines.append("")
+
+        return "\n".join(lines).rstrip("-\n")
+
+    def _forecast_by_date(self, days: List[Dict]) -> Dict[date, Dict]:
+        forecast = {}
+        for day in days:
+            day_date = self._as_date(day.get("date"))
+            if day_date:
+                forecast[day_date] = day
+        return forecast
+
+    def _as_date(self, value) -> Optional[date]:
+        if isinstance(value, date):
+            return value
+        try:
+            return date.fromisoformat(str(value))
+        except ValueError:
+            return None
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict
+from fastapi import HTTPException
+
+class BoundedExecutor:
+    """
+    Dedicated thread pool for blocking calls made from async routes.
+    Caps how many calls may be running or waiting at once and records
+    queue depth, queue wait and run time so a saturated pool is visible.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, sample_size: int = 512):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._pending = 0
+        self._max_pending = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._failed = 0
+        self._wait_samples = deque(maxlen=sample_size)
+        self._run_samples = deque(maxlen=sample_size)
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        Run a blocking callable on the pool and await its result.
+
+        Raises:
+            HTTPException: 503 if the pool and its queue are already full
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise HTTPException(status_code=503, detail=f"{self.name} is busy, please retry")
+
+        self._pending += 1
+        self._submitted += 1
+        self._max_pending = max(self._max_pending, self._pending)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._pool,
+                partial(self._timed, fn, time.perf_counter(), args, kwargs)
+            )
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+
+    def _timed(self, fn: Callable, submitted_at: float, args, kwargs):
+        started = time.perf_counter()
+        self._wait_samples.append(started - submitted_at)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._run_samples.append(time.perf_counter() - started)
+
+    def stats(self) -> Dict:
+        """Return queue depth and latency figures (milliseconds) for the pool."""
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "queued": max(0, self._pending - self.max_workers),
+            "max_pending": self._max_pending,
+            "submitted": self._submitted,
+            "rejected": self._rejected,
+            "failed": self._failed,
+            "queue_wait_ms": self._percentiles(self._wait_samples),
+            "run_time_ms": self._percentiles(self._run_samples)
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+    def _percentiles(self, samples) -> Dict:
+        ordered = sorted(samples)
+        if not ordered:
+            return {"p50": None, "p95": None, "max": None}
+
+        def pick(fraction: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 2)
+
+        return {"p50": pick(0.5), "p95": pick(0.95), "max": round(ordered[-1] * 1000, 2)}
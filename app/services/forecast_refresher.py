@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Dict, List, Optional
+from sqlmodel import Session, select
+from app.config.config import engine, settings
+from app.models.park import Park
+from app.services.park_catalog import park_catalog
+from app.services.shared_segment import SharedSegment
+from app.services.weather_service import WeatherService
+from app.services.resilience import weather_upstream
+
+SEGMENT_ENV = "FORECAST_SHM"
+
+logger = logging.getLogger(__name__)
+
+class ForecastRefresher:
+    """
+    Keeps a 7-day forecast summary warm for every park.
+    Each cycle spreads one refresh per park evenly across the refresh window
+    (with jitter) and runs them with bounded concurrency, so requests for a
+    known park read the stored summary instead of calling the weather API.
+    Under gunicorn the master creates a shared-memory segment and a refresher
+    process forked from it runs the refresher once and publishes the
+    summaries there for workers to read; a single process refreshes on its
+    own loop and keeps them locally.
+    """
+
+    def __init__(self, weather_service: WeatherService, interval: float, concurrency: int):
+        self.weather_service = weather_service
+        self.interval = interval
+        self.concurrency = concurrency
+        self._forecasts: Dict[str, Dict] = {}
+        self._shared = SharedSegment(SEGMENT_ENV)
+        self._publisher_pid: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def _publishing(self) -> bool:
+        # Only the refresher process publishes; workers inherit this object but never do
+        return self._publisher_pid == os.getpid()
+
+    @property
+    def shared(self) -> bool:
+        """Whether a refresher process refreshes forecasts for this process."""
+        return self._shared.advertised
+
+    def get(self, parkcode: str) -> Optional[Dict]:
+        """Stored forecast summary for a park, or None if it hasn't been fetched yet."""
+        forecasts = self._forecasts
+        if not self._publishing and self._shared.advertised:
+            document = self._shared.read()
+            forecasts = document["forecasts"] if document else {}
+        entry = forecasts.get(parkcode)
+        return entry["summary"] if entry else None
+
+    async def start(self):
+        """Refresh on the running loop (single-process mode)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def create_shared(self, name: str, size: int):
+        """Create the shared segment in the master, before any process is forked."""
+        self._shared.create(name, size)
+
+    def run_shared(self):
+        """Refresh and publish to the shared segment until the process is stopped (refresher process)."""
+        self._publisher_pid = os.getpid()
+        asyncio.run(self._run())
+
+    def close_shared(self):
+        """Release the shared segment (master)."""
+        self._shared.close()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                await self.refresh_all()
+            except Exception as e:
+                logger.error("Forecast refresh cycle failed: %s", e)
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def refresh_all(self):
+        """Refresh every park once, spread across the refresh window."""
+        parks = await asyncio.to_thread(self._load_parks)
+        if not parks:
+            return
+
+        # Parks we have never fetched go first and immediately; the rest are staggered
+        parks.sort(key=lambda park: park["parkcode"] in self._forecasts)
+        missing = sum(1 for park in parks if park["parkcode"] not in self._forecasts)
+        slot = self.interval / len(parks)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        cycle_start = time.monotonic()
+
+        async def refresh(index: int, park: Dict):
+            if index >= missing:
+                delay = index * slot + random.uniform(0, slot) - (time.monotonic() - cycle_start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            async with semaphore:
+                await self.refresh_park(park)
+
+        await asyncio.gather(*(refresh(index, park) for index, park in enumerate(parks)))
+
+    async def refresh_park(self, park: Dict):
+        try:
+            forecast = await weather_upstream.call(
+                self.weather_service.fetch_forecast, park["latitude"], park["longitude"]
+            )
+            self._forecasts[park["parkcode"]] = {
+                "fetched_at": time.time(),
+                "summary": self.weather_service.summarize_forecast(forecast)
+            }
+            if self._publishing:
+                self._shared.publish({"forecasts": self._forecasts})
+        except Exception as e:
+            # Keep serving the previous forecast until the next cycle
+            logger.warning("Forecast refresh failed for %s: %s", park["parkcode"], e)
+
+    def _load_parks(self) -> List[Dict]:
+        parks = park_catalog.all()
+        if parks is None and self._publishing:
+            # In the refresher process, which has no use for the workers' pooled engine
+            parks = park_catalog.load_from_database(settings.DATABASE_URL)
+        elif parks is None:
+            with Session(engine) as session:
+                parks = [park.model_dump(mode="json") for park in session.exec(select(Park)).all()]
+
+        located = []
+        for park in parks:
+            location = park.get("location") or {}
+            latitude = park.get("latitude") if park.get("latitude") is not None else location.get("lat")
+            longitude = park.get("longitude") if park.get("longitude") is not None else location.get("lng")
+            if latitude is not None and longitude is not None:
+                located.append({"parkcode": park["parkcode"], "latitude": latitude, "longitude": longitude})
+        return located
+
+forecast_refresher = ForecastRefresher(
+    WeatherService(),
+    interval=settings.WEATHER_REFRESH_SECONDS,
+    concurrency=settings.WEATHER_REFRESH_CONCURRENCY
+)
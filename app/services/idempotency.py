@@ -0,0 +1,281 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import delete
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from app.models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+class IdempotencyStore:
+    """
+    Remembers the outcome of requests sent with an Idempotency-Key header.
+    A (user, key) is claimed by inserting a row into `idempotency_keys`; the
+    primary key makes the claim unique across every worker. The worker that
+    claims it runs the request and stores the result in the row, and a retry
+    arriving on any worker replays that result, or waits for it while the
+    original is still running. The original runs in its own request's task,
+    so route attribution and response headers stay with it; within one
+    process a retry attaches to its outcome directly. Replays carry the
+    headers the original set. Failed requests release their claim so they
+    can be retried; claims whose worker died expire after `lock_timeout`
+    seconds and results after `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float, max_keys: int = 10000, engine: Optional[Engine] = None,
+                 lock_timeout: float = 120.0, poll_interval: float = 0.5):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.engine = engine
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._entries: Dict[Tuple[str, str], Dict] = {}
+
+    def fingerprint(self, operation: str, payload: Any) -> str:
+        """Hash of the operation and its canonical JSON payload."""
+        body = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(f"{operation}\n{body}".encode("utf-8")).hexdigest()
+
+    async def run(
+        self,
+        scope: str,
+        key: Optional[str],
+        fingerprint: str,
+        work: Callable[[], Awaitable[Any]],
+        response: Optional[Response] = None
+    ) -> Any:
+        """
+        Run `work` once per (scope, key).
+
+        Args:
+            scope (str): Owner of the key, normally the user id
+            key (Optional[str]): Idempotency-Key header value; without one `work` just runs
+            fingerprint (str): Request fingerprint from `fingerprint()`
+            work (Callable): Coroutine function producing the response body
+            response (Optional[Response]): Given the original's headers and marked with
+                                           Idempotent-Replayed when the result is reused
+
+        Returns:
+            Any: The result of the original run
+
+        Raises:
+            HTTPException: If the key is too long, was used for a different request,
+                           or its original request is still running after `lock_timeout`
+        """
+        if key is None:
+            return await work()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail="Invalid Idempotency-Key")
+
+        now = time.monotonic()
+        entry_key = (scope, key)
+        entry = self._entries.get(entry_key)
+        if entry is not None and entry["done"] and entry["expires_at"] <= now:
+            entry = None
+        if entry is not None:
+            self._check_fingerprint(entry["fingerprint"], fingerprint)
+            if not entry["done"]:
+                future = entry["future"]
+                try:
+                    await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    if not future.cancelled():
+                        raise
+                    # The original's client went away and cancelled it: run it for this one
+                    return await self.run(scope, key, fingerprint, work, response)
+            self._replay(response, entry["headers"])
+            return entry["result"] if entry["done"] else entry["future"].result()
+
+        if self.engine is not None:
+            claim = await asyncio.to_thread(self._claim, scope, key, fingerprint)
+            if claim is not None:
+                # Claimed by another worker (or an earlier run of this one)
+                return await self._await_claim(scope, key, fingerprint, claim, work, response)
+
+        if len(self._entries) >= self.max_keys:
+            self._prune(now)
+
+        future = asyncio.get_running_loop().create_future()
+        # Retrieve failures even when no retry attached, so they aren't logged as unhandled
+        future.add_done_callback(lambda finished: finished.cancelled() or finished.exception())
+        entry = {
+            "fingerprint": fingerprint,
+            "future": future,
+            "done": False,
+            "result": None,
+            "headers": {},
+            "expires_at": now + self.ttl
+        }
+        self._entries[entry_key] = entry
+        before = dict(response.headers) if response is not None else {}
+        try:
+            result = await self._run_claimed(scope, key, work, response, before)
+        except asyncio.CancelledError:
+            self._forget(entry_key, entry)
+            future.cancel()
+            raise
+        except BaseException as e:
+            self._forget(entry_key, entry)
+            future.set_exception(e)
+            raise
+        entry["headers"] = self._headers_set(response, before)
+        future.set_result(result)
+        self._finish(entry_key, entry, result)
+        return result
+
+    async def _run_claimed(
+        self,
+        scope: str,
+        key: str,
+        work: Callable[[], Awaitable[Any]],
+        response: Optional[Response],
+        before: Dict[str, str]
+    ) -> Any:
+        try:
+            result = await work()
+        except BaseException:
+            if self.engine is not None:
+                await asyncio.to_thread(self._release, scope, key)
+            raise
+        if self.engine is not None:
+            try:
+                await asyncio.to_thread(self._complete, scope, key, result, self._headers_set(response, before))
+            except Exception as e:
+                # The work itself succeeded; retries wait for the claim to expire
+                logger.error("Storing idempotent result for key %s failed: %s", key, e)
+        return result
+
+    async def _await_claim(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        claim: IdempotencyKey,
+        work: Callable[[], Awaitable[Any]],
+        response: Optional[Response]
+    ) -> Any:
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            self._check_fingerprint(claim.fingerprint, fingerprint)
+            if claim.response is not None:
+                stored = json.loads(claim.response)
+                self._replay(response, stored["headers"])
+                return stored["result"]
+            if time.monotonic() >= deadline:
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+            await asyncio.sleep(self.poll_interval)
+            claim = await asyncio.to_thread(self._load, scope, key)
+            if claim is None or (claim.response is None and claim.expires_at <= datetime.utcnow()):
+                # The original failed and released the key, or its worker died: run it again
+                return await self.run(scope, key, fingerprint, work, response)
+
+    def _headers_set(self, response: Optional[Response], before: Dict[str, str]) -> Dict[str, str]:
+        """Headers the original run added to its response."""
+        if response is None:
+            return {}
+        return {name: value for name, value in response.headers.items() if before.get(name) != value}
+
+    def _replay(self, response: Optional[Response], headers: Dict[str, str]):
+        if response is None:
+            return
+        for name, value in headers.items():
+            response.headers[name] = value
+        response.headers[REPLAYED_HEADER] = "true"
+
+    def _check_fingerprint(self, stored: str, fingerprint: str):
+        if stored != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+
+    def _claim(self, scope: str, key: str, fingerprint: str) -> Optional[IdempotencyKey]:
+        """Insert the claim row. Returns None if this call claimed the key, else the existing row."""
+        now = datetime.utcnow()
+        with Session(self.engine) as session:
+            if random.random() < 0.01:
+                session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+                session.commit()
+            for _ in range(2):
+                session.add(IdempotencyKey(
+                    user_id=scope,
+                    key=key,
+                    fingerprint=fingerprint,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.lock_timeout)
+                ))
+                try:
+                    session.commit()
+                    return None
+                except IntegrityError:
+                    session.rollback()
+
+                existing = session.get(IdempotencyKey, (scope, key))
+                if existing is None:
+                    # Released between our insert and the lookup
+                    continue
+                if existing.expires_at > now:
+                    session.expunge(existing)
+                    return existing
+                # An expired result, or a claim whose worker died: take it over
+                session.delete(existing)
+                session.commit()
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+
+    def _load(self, scope: str, key: str) -> Optional[IdempotencyKey]:
+        with Session(self.engine) as session:
+            row = session.get(IdempotencyKey, (scope, key))
+            if row is not None:
+                session.expunge(row)
+            return row
+
+    def _complete(self, scope: str, key: str, result: Any, headers: Dict[str, str]):
+        with Session(self.engine) as session:
+            row = session.get(IdempotencyKey, (scope, key))
+            if row is None:
+                return
+            row.response = json.dumps({"result": result, "headers": headers}, default=str)
+            row.expires_at = datetime.utcnow() + timedelta(seconds=self.ttl)
+            session.add(row)
+            session.commit()
+
+    def _release(self, scope: str, key: str):
+        with Session(self.engine) as session:
+            session.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == scope,
+                IdempotencyKey.key == key,
+                IdempotencyKey.response.is_(None)
+            ))
+            session.commit()
+
+    def _finish(self, entry_key: Tuple[str, str], entry: Dict, result: Any):
+        if self._entries.get(entry_key) is not entry:
+            return
+        if self.engine is not None:
+            # Results are replayed from the shared table
+            del self._entries[entry_key]
+            return
+        entry.update(done=True, result=result, future=None, expires_at=time.monotonic() + self.ttl)
+
+    def _forget(self, entry_key: Tuple[str, str], entry: Dict):
+        # Failures aren't remembered, so they can be retried
+        if self._entries.get(entry_key) is entry:
+            del self._entries[entry_key]
+
+    def _prune(self, now: float):
+        self._entries = {
+            entry_key: entry for entry_key, entry in self._entries.items()
+            if not entry["done"] or entry["expires_at"] > now
+        }
+        # Still full of live keys: drop the oldest finished ones
+        finished = [entry_key for entry_key, entry in self._entries.items() if entry["done"]]
+        for entry_key in finished[:len(self._entries) - self.max_keys + 1]:
+            del self._entries[entry_key]
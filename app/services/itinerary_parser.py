@@ -0,0 +1,85 @@
+from typing import Dict, Optional
+
+TIME_BLOCKS = ("Morning", "Afternoon", "Evening")
+LODGING_PREFIX = "🏨"
+RESTAURANT_PREFIX = "🍽"
+BULLET_PREFIXES = ("•", "-", "*")
+
+class ItineraryParser:
+    """
+    Parses generated itinerary text into a structured day plan.
+    The result is stored alongside the description so PDF rendering and
+    per-day views don't have to re-scan the text.
+    """
+
+    def parse(self, text: Optional[str]) -> Dict:
+        """
+        Parse itinerary text in the '📅 Day' / Morning / Afternoon / Evening format.
+
+        Args:
+            text (Optional[str]): Itinerary description
+
+        Returns:
+            Dict: {"intro": [...], "days": [...]} where each day holds its header,
+                  title, time blocks, lodging, restaurant and any other notes
+        """
+        plan = {"intro": [], "days": []}
+        day = None
+        block = None
+
+        for raw_line in (text or "").split("\n"):
+            line = raw_line.strip()
+            if not line or line == "---":
+                continue
+
+            if line.startswith("📅 Day"):
+                day = self._new_day(line, len(plan["days"]) + 1)
+                plan["days"].append(day)
+                block = None
+                continue
+
+            if day is None:
+                plan["intro"].append(line)
+                continue
+
+            block_name = self._time_block(line)
+            if block_name:
+                block = {"name": block_name, "items": []}
+                day["blocks"].append(block)
+                # Keep anything written on the same line as the label, minus the
+                # emphasis that closes a bold label like "**Afternoon:**"
+                remainder = line.split(":", 1)[1].strip().strip("*_").strip()
+                if remainder:
+                    block["items"].append(remainder)
+            elif line.startswith(LODGING_PREFIX):
+                day["lodging"] = line[len(LODGING_PREFIX):].strip("\ufe0f ")
+                block = None
+            elif line.startswith(RESTAURANT_PREFIX):
+                day["restaurant"] = line[len(RESTAURANT_PREFIX):].strip("\ufe0f ")
+                block = None
+            elif block is not None:
+                block["items"].append(line.lstrip("".join(BULLET_PREFIXES)).strip())
+            else:
+                day["notes"].append(line)
+
+        return plan
+
+    def _new_day(self, header: str, position: int) -> Dict:
+        label, _, title = header.partition(":")
+        digits = "".join(ch for ch in label.split("-")[0] if ch.isdigit())
+        return {
+            "day": int(digits) if digits else position,
+            "header": header,
+            "title": title.strip(),
+            "blocks": [],
+            "lodging": None,
+            "restaurant": None,
+            "notes": []
+        }
+
+    def _time_block(self, line: str) -> Optional[str]:
+        for name in TIME_BLOCKS:
+            if line.lstrip("*#").strip().startswith(f"{name}:"):
+                return name
+        return None
+
@@ -1,29 +1,37 @@
+import asyncio
 import requests
 from typing import List, Optional, Dict
 from fastapi import HTTPException
 from app.config.config import settings
+from app.services.resilience import nps_upstream
 
 class NPSService:
     def __init__(self):
         self.api_key = settings.NPS_API_KEY
         self.base_url = "https://developer.nps.gov/api/v1"
+        # Last good response per park, served while the NPS API is failing
+        self._stale_details: Dict[str, Dict] = {}
+
+    def _get(self, path: str, params: Dict) -> Dict:
+        response = requests.get(
+            f"{self.base_url}{path}",
+            params={"api_key": self.api_key, **params},
+            timeout=nps_upstream.timeout
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def get_parks(self, state: Optional[str] = None, limit: int = 50) -> List[Dict]:
         """Get list of national parks"""
         try:
             params = {
-                "api_key": self.api_key,
                 "limit": limit
             }
             if state:
                 params["stateCode"] = state
 
-            response = requests.get(
-                f"{self.base_url}/parks",
-                params=params
-            )
-            response.raise_for_status()
-            return response.json()["data"]
+            response = await nps_upstream.call(self._get, "/parks", params)
+            return response["data"]
         except Exception as e:
             raise HTTPException(
                 status_code=500,
@@ -33,18 +41,43 @@ class NPSService:
     async def get_park_details(self, park_code: str) -> Dict:
         """Get detailed information about a specific park"""
         try:
-            response = requests.get(
-                f"{self.base_url}/parks",
-                params={
-                    "api_key": self.api_key,
-                    "parkCode": park_code
-                }
-            )
-            response.raise_for_status()
-            data = response.json()["data"]
-            return data[0] if data else None
+            response = await nps_upstream.call(self._get, "/parks", {"parkCode": park_code})
+            data = response["data"]
+            details = data[0] if data else None
+            if details:
+                self._stale_details[park_code] = details
+            return details
         except Exception as e:
+            if park_code in self._stale_details:
+                return self._stale_details[park_code]
             raise HTTPException(
                 status_code=500,
                 detail=f"Error fetching park details: {str(e)}"
-            )
\ No newline at end of file
+            )
+
+    async def get_all_parks(self, page_size: int = 100, concurrency: int = 8) -> List[Dict]:
+        """
+        Get every park unit from the NPS API.
+        The first page reports the total; the remaining pages are fetched concurrently.
+        """
+        try:
+            first_page = await nps_upstream.call(self._get, "/parks", {"start": 0, "limit": page_size})
+            parks = list(first_page["data"])
+            total = int(first_page["total"])
+
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch(start: int) -> List[Dict]:
+                async with semaphore:
+                    page = await nps_upstream.call(self._get, "/parks", {"start": start, "limit": page_size})
+                    return page["data"]
+
+            pages = await asyncio.gather(*(fetch(start) for start in range(page_size, total, page_size)))
+            for page in pages:
+                parks.extend(page)
+            return parks
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error fetching parks: {str(e)}"
+            )
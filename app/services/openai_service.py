@@ -1,8 +1,10 @@
 from openai import AsyncOpenAI
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 from fastapi import HTTPException
 from dotenv import load_dotenv
 import os
+from app.config.config import settings
+from app.services.resilience import openai_upstream
 
 class OpenAIService:
     """
@@ -17,7 +19,12 @@ class OpenAIService:
         """
         try:
             load_dotenv()
-            self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            # Timeouts and retries are handled by openai_upstream
+            self.client = AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                timeout=settings.OPENAI_TIMEOUT,
+                max_retries=0
+            )
         except Exception as e:
             raise Exception(f"Failed to initialize OpenAI client: {str(e)}")
 
@@ -57,7 +64,9 @@ class OpenAIService:
             """
 
             # Make API call to OpenAI
-            response = await self.client.chat.completions.create(
+            response = await openai_upstream.call(
+                self.client.chat.completions.create,
+                idempotent=False,
                 model="gpt-4",
                 messages=[
                     {
@@ -80,28 +89,24 @@ class OpenAIService:
                 detail=f"Error generating description: {str(e)}"
             )
 
-    async def generate_detailed_itinerary(self, park_name: str, preferences: dict, weather_data: dict) -> str:
+    def build_itinerary_prompts(self, park_name: str, preferences: dict, weather_data: dict) -> Tuple[str, str]:
         """
-        Generate a detailed park visit itinerary based on user preferences and weather.
+        Build the system and user prompts for a detailed itinerary.
         
         Args:
             park_name (str): Name of the park
             preferences (dict): User preferences including duration, activities, etc.
-            weather_data (dict): Current weather conditions
+            weather_data (dict): Current weather conditions and optional daily forecast
             
         Returns:
-            str: Structured daily itinerary
-            
-        Raises:
-            HTTPException: If generation fails
+            Tuple[str, str]: System prompt and user prompt
         """
-        try:
-            # Determine accommodation format based on camping preference
-            is_camping = 'camping' in preferences['preferred_activities']
-            accommodation_format = "🏨 Recommended Campsite: [Name]" if is_camping else "🏨 Recommended Hotel: [Name] (Rating: 4.4+)"
+        # Determine accommodation format based on camping preference
+        is_camping = 'camping' in preferences['preferred_activities']
+        accommodation_format = "🏨 Recommended Campsite: [Name]" if is_camping else "🏨 Recommended Hotel: [Name] (Rating: 4.4+)"
 
-            # Define system prompt with required formatting
-            system_prompt = f"""You are an AI assistant integrated into the National Parks Explorer application.
+        # Define system prompt with required formatting
+        system_prompt = f"""You are an AI assistant integrated into the National Parks Explorer application.
 
 REQUIRED DAILY FORMAT:
 📅 Day [Number]: [Title]
@@ -125,15 +130,46 @@ Evening:
 
 Follow this exact format for each day of the itinerary."""
 
-            # Construct user prompt with specific details
-            user_prompt = f"""Plan a {preferences['num_days']} day trip to {park_name} for the {preferences['visit_season']}.
+        # Construct user prompt with specific details
+        user_prompt = f"""Plan a {preferences['num_days']} day trip to {park_name} for the {preferences['visit_season']}.
             Fitness Level: {preferences['fitness_level']} (adjust trail distances accordingly)
             Preferred Activities: {', '.join(preferences['preferred_activities'])}
             Weather: Current conditions: {weather_data['current']['conditions']}, {weather_data['current']['temp']}°F
             Dates: {preferences['start_date']} to {preferences['end_date']}"""
 
+        # Add the daily forecast when the refresher has one for this park
+        if weather_data.get('days'):
+            forecast_lines = "\n".join(
+                f"{day['date']}: {day['conditions']}, high {day['high']}°F, low {day['low']}°F, "
+                f"{day['chance_of_rain']}% rain, {day['chance_of_snow']}% snow"
+                for day in weather_data['days']
+            )
+            user_prompt += f"\n            7-Day Forecast:\n{forecast_lines}"
+
+        return system_prompt, user_prompt
+
+    async def generate_detailed_itinerary(self, park_name: str, preferences: dict, weather_data: dict) -> str:
+        """
+        Generate a detailed park visit itinerary based on user preferences and weather.
+        
+        Args:
+            park_name (str): Name of the park
+            preferences (dict): User preferences including duration, activities, etc.
+            weather_data (dict): Current weather conditions
+            
+        Returns:
+            str: Structured daily itinerary
+            
+        Raises:
+            HTTPException: If generation fails
+        """
+        try:
+            system_prompt, user_prompt = self.build_itinerary_prompts(park_name, preferences, weather_data)
+
             # Generate itinerary via OpenAI
-            response = await self.client.chat.completions.create(
+            response = await openai_upstream.call(
+                self.client.chat.completions.create,
+                idempotent=False,
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -179,7 +215,9 @@ Follow this exact format for each day of the itinerary."""
             """
 
             # Generate recommendations via OpenAI
-            response = await self.client.chat.completions.create(
+            response = await openai_upstream.call(
+                self.client.chat.completions.create,
+                idempotent=False,
                 model="gpt-4",
                 messages=[
                     {
@@ -200,4 +238,6 @@ Follow this exact format for each day of the itinerary."""
             raise HTTPException(
                 status_code=500,
                 detail=f"Error generating activity recommendations: {str(e)}"
-            )
\ No newline at end of file
+            )
+
+openai_service = OpenAIService()
@@ -0,0 +1,106 @@
+import logging
+import threading
+from typing import Dict, List, Optional
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, create_engine, select
+from app.models.park import Park
+from app.services.activity_index import load_park_activities
+from app.services.shared_segment import SharedSegment
+
+SEGMENT_ENV = "PARK_CATALOG_SHM"
+
+logger = logging.getLogger(__name__)
+
+class ParkCatalog:
+    """
+    Read-mostly copy of the parks table held in a shared-memory segment.
+    In multi-worker mode the gunicorn master builds the segment, a refresher
+    process forked from it keeps it current, and every worker reads from it
+    instead of keeping its own copy.
+    Readers fall back to the database whenever no segment is attached.
+    """
+
+    def __init__(self):
+        self._shared = SharedSegment(SEGMENT_ENV)
+        self._refresher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # --- Master side -------------------------------------------------------
+
+    def create(self, name: str, size: int):
+        """Create the shared-memory segment and advertise its name to workers."""
+        self._shared.create(name, size)
+
+    def publish(self, parks: List[Dict]) -> bool:
+        """
+        Write a new catalog into the segment.
+
+        Returns:
+            bool: False if the catalog did not change or does not fit
+        """
+        return self._shared.publish({"parks": parks})
+
+    def load_from_database(self, database_url: str) -> List[Dict]:
+        """Read every park using a throwaway engine so no pooled connection leaks into forked workers."""
+        engine = create_engine(database_url, poolclass=NullPool)
+        try:
+            with Session(engine) as session:
+                activities = load_park_activities(session)
+                return [
+                    {**park.model_dump(mode="json"), "activities": activities.get(str(park.id), [])}
+                    for park in session.exec(select(Park)).all()
+                ]
+        finally:
+            engine.dispose()
+
+    def start_refresher(self, database_url: str, interval: float):
+        """
+        Rebuild the catalog from the database every `interval` seconds in a
+        background thread. Only called in the refresher process: the master
+        keeps forking workers, and must not have threads of its own running.
+        """
+        def refresh_loop():
+            while not self._stop.wait(interval):
+                try:
+                    if self.publish(self.load_from_database(database_url)):
+                        logger.info("Park catalog refreshed")
+                except Exception as e:
+                    logger.error("Park catalog refresh failed: %s", e)
+
+        self._refresher = threading.Thread(target=refresh_loop, name="park-catalog-refresh", daemon=True)
+        self._refresher.start()
+
+    def close(self):
+        """Stop refreshing and release the segment."""
+        self._stop.set()
+        self._shared.close()
+
+    # --- Worker side -------------------------------------------------------
+
+    def _read(self) -> Optional[Dict]:
+        payload = self._shared.read()
+        if payload is not None and "by_code" not in payload:
+            # Indexed once per published generation
+            payload["by_code"] = {park["parkcode"]: park for park in payload["parks"]}
+        return payload
+
+    def all(self) -> Optional[List[Dict]]:
+        """All parks, or None if no catalog is available."""
+        payload = self._read()
+        return payload["parks"] if payload else None
+
+    def get(self, parkcode: str) -> Optional[Dict]:
+        """A single park by code. Returns None if missing or no catalog is available."""
+        payload = self._read()
+        return payload["by_code"].get(parkcode) if payload else None
+
+    @property
+    def available(self) -> bool:
+        return self._read() is not None
+
+    @property
+    def generation(self) -> Optional[int]:
+        """Generation of the catalog last read, which changes whenever the master republishes."""
+        return self._shared.generation
+
+park_catalog = ParkCatalog()
@@ -3,8 +3,12 @@ from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from io import BytesIO
+from app.services.itinerary_parser import ItineraryParser
 
 class PDFService:
+    def __init__(self):
+        self.parser = ItineraryParser()
+
     def generate_itinerary_pdf(self, itinerary_data):
         buffer = BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=letter)
@@ -53,17 +57,26 @@ class PDFService:
         story.append(Paragraph(itinerary_data['title'], styles['CustomTitle']))
         story.append(Spacer(1, 20))
         
-        # Format description with proper spacing and styling
-        description_lines = itinerary_data['description'].split('\n')
-        for line in description_lines:
-            if line.strip().startswith('📅 Day'):
-                story.append(Paragraph(line, styles['DayHeader']))
-            elif any(time in line for time in ['Morning:', 'Afternoon:', 'Evening:']):
-                story.append(Paragraph(line, styles['TimeBlock']))
-            elif line.strip().startswith(('🍽️', '🏨')):
-                story.append(Paragraph(line, styles['TimeBlock']))
-            elif line.strip():
-                story.append(Paragraph(line, styles['RegularText']))
+        # Render from the stored day plan, parsing only for rows that predate it
+        day_plan = itinerary_data.get('day_plan') or self.parser.parse(itinerary_data.get('description'))
+
+        for line in day_plan['intro']:
+            story.append(Paragraph(line, styles['RegularText']))
+            story.append(Spacer(1, 6))
+
+        for day in day_plan['days']:
+            story.append(Paragraph(day['header'], styles['DayHeader']))
+            for block in day['blocks']:
+                story.append(Paragraph(f"{block['name']}:", styles['TimeBlock']))
+                for item in block['items']:
+                    story.append(Paragraph(f"• {item}", styles['RegularText']))
+                    story.append(Spacer(1, 6))
+            if day['lodging']:
+                story.append(Paragraph(f"🏨 {day['lodging']}", styles['TimeBlock']))
+            if day['restaurant']:
+                story.append(Paragraph(f"🍽️ {day['restaurant']}", styles['TimeBlock']))
+            for note in day['notes']:
+                story.append(Paragraph(note, styles['RegularText']))
                 story.append(Spacer(1, 6))
         
         doc.build(story)
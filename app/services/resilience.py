@@ -0,0 +1,182 @@
+import asyncio
+import inspect
+import logging
+import random
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+import openai
+import requests
+from app.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+class UpstreamUnavailable(Exception):
+    """Raised without calling the upstream while its circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds, then lets a single trial call through.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+class Upstream:
+    """
+    Resilience policy for one upstream API: a per-attempt timeout, jittered
+    retries for idempotent reads, an optional hedged second request once an
+    attempt outlives the observed p95, and a circuit breaker.
+    Blocking callables run in a worker thread; coroutine functions are awaited.
+    """
+
+    def __init__(self, name: str, timeout: float, retries: int = 2, backoff: float = 0.2,
+                 hedge: bool = False, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge = hedge
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._latencies = deque(maxlen=200)
+        self._counts = {"calls": 0, "failures": 0, "retries": 0, "hedged": 0, "rejected": 0}
+
+    async def call(self, fn: Callable, *args, idempotent: bool = True, **kwargs):
+        """
+        Call the upstream under this policy.
+
+        Raises:
+            UpstreamUnavailable: If the circuit breaker is open
+            Exception: The last error once retries are exhausted
+        """
+        if not self.breaker.allow():
+            self._counts["rejected"] += 1
+            raise UpstreamUnavailable(f"{self.name} is unavailable")
+
+        self._counts["calls"] += 1
+        attempts = 1 + (self.retries if idempotent else 0)
+        for attempt in range(attempts):
+            try:
+                result = await self._attempt(fn, args, kwargs, hedge=self.hedge and idempotent)
+                self.breaker.record_success()
+                return result
+            except Exception as e:
+                if not self._is_transient(e):
+                    # The upstream answered; a client error says nothing about its health
+                    self.breaker.record_success()
+                    raise
+                if attempt == attempts - 1:
+                    self._counts["failures"] += 1
+                    self.breaker.record_failure()
+                    logger.warning("%s call failed after %d attempt(s): %s", self.name, attempts, e)
+                    raise
+                self._counts["retries"] += 1
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    async def _attempt(self, fn: Callable, args, kwargs, hedge: bool):
+        hedge_after = self._percentile(0.95) if hedge and len(self._latencies) >= 20 else None
+        if hedge_after is None or hedge_after >= self.timeout:
+            return await asyncio.wait_for(self._run(fn, args, kwargs), self.timeout)
+
+        started = time.monotonic()
+        pending = {asyncio.create_task(self._run(fn, args, kwargs))}
+        done, _ = await asyncio.wait(pending, timeout=hedge_after)
+        if not done:
+            self._counts["hedged"] += 1
+            pending.add(asyncio.create_task(self._run(fn, args, kwargs)))
+
+        error = None
+        while pending:
+            remaining = self.timeout - (time.monotonic() - started)
+            done, pending = await asyncio.wait(pending, timeout=max(0.0, remaining), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return task.result()
+                error = task.exception()
+
+        for task in pending:
+            task.cancel()
+        raise error or asyncio.TimeoutError()
+
+    async def _run(self, fn: Callable, args, kwargs):
+        started = time.monotonic()
+        # unwrap() so decorated async SDK methods aren't mistaken for blocking ones
+        if inspect.iscoroutinefunction(inspect.unwrap(fn)):
+            result = await fn(*args, **kwargs)
+        else:
+            result = await asyncio.to_thread(fn, *args, **kwargs)
+        self._latencies.append(time.monotonic() - started)
+        return result
+
+    def _is_transient(self, error: Exception) -> bool:
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return error.response.status_code >= 500 or error.response.status_code == 429
+        return isinstance(error, (
+            asyncio.TimeoutError,
+            requests.ConnectionError,
+            requests.Timeout,
+            openai.APIConnectionError,
+            openai.RateLimitError,
+            openai.InternalServerError
+        ))
+
+    def _percentile(self, fraction: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def stats(self) -> Dict:
+        p50, p95 = self._percentile(0.5), self._percentile(0.95)
+        return {
+            "name": self.name,
+            "state": self.breaker.state,
+            "timeout_s": self.timeout,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            **self._counts
+        }
+
+nps_upstream = Upstream("nps", timeout=settings.NPS_TIMEOUT, hedge=True)
+weather_upstream = Upstream("weather", timeout=settings.WEATHER_TIMEOUT, hedge=True)
+# Completions are expensive and not safe to duplicate, so no retries or hedging
+openai_upstream = Upstream("openai", timeout=settings.OPENAI_TIMEOUT, retries=0, failure_threshold=3, reset_timeout=60.0)
+
+upstreams = [nps_upstream, weather_upstream, openai_upstream]
@@ -0,0 +1,152 @@
+import math
+from typing import Dict, List, Sequence, Tuple
+from fastapi import HTTPException
+
+EARTH_RADIUS_MILES = 3958.8
+
+class RouteService:
+    """
+    Service class for planning multi-park road trips.
+    Orders parks into a short driving loop and splits the day budget between them.
+    """
+
+    def build_distance_matrix(self, coordinates: Sequence[Tuple[float, float]]) -> List[List[float]]:
+        """
+        Build a symmetric great-circle distance matrix (in miles) for a list of coordinates.
+
+        Args:
+            coordinates (Sequence[Tuple[float, float]]): (latitude, longitude) pairs
+
+        Returns:
+            List[List[float]]: Matrix where matrix[i][j] is the distance between stop i and j
+        """
+        # Precompute the trig terms once per stop, then each pair is a handful of multiplies
+        lats = [math.radians(lat) for lat, _ in coordinates]
+        lons = [math.radians(lon) for _, lon in coordinates]
+        cos_lats = [math.cos(lat) for lat in lats]
+        size = len(coordinates)
+        matrix = [[0.0] * size for _ in range(size)]
+
+        for i in range(size):
+            row = matrix[i]
+            for j in range(i + 1, size):
+                dlat = math.sin((lats[j] - lats[i]) / 2)
+                dlon = math.sin((lons[j] - lons[i]) / 2)
+                a = dlat * dlat + cos_lats[i] * cos_lats[j] * dlon * dlon
+                distance = 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+                row[j] = distance
+                matrix[j][i] = distance
+        return matrix
+
+    def order_stops(self, matrix: List[List[float]], start: int = 0) -> List[int]:
+        """
+        Find a short visiting order using nearest-neighbour construction followed by 2-opt.
+
+        Args:
+            matrix (List[List[float]]): Distance matrix from build_distance_matrix
+            start (int): Index of the first stop
+
+        Returns:
+            List[int]: Stop indices in visiting order
+        """
+        size = len(matrix)
+        if size <= 2:
+            return list(range(size))
+
+        # Nearest-neighbour tour
+        tour = [start]
+        unvisited = set(range(size)) - {start}
+        while unvisited:
+            row = matrix[tour[-1]]
+            nearest = min(unvisited, key=row.__getitem__)
+            tour.append(nearest)
+            unvisited.remove(nearest)
+
+        # 2-opt on the open path: reverse tour[i:j+1] whenever it shortens the route
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, size - 1):
+                a, b = tour[i - 1], tour[i]
+                row_a, row_b = matrix[a], matrix[b]
+                d_ab = row_a[b]
+                for j in range(i + 1, size):
+                    c = tour[j]
+                    if j + 1 < size:
+                        d = tour[j + 1]
+                        delta = row_a[c] + row_b[d] - d_ab - matrix[c][d]
+                    else:
+                        delta = row_a[c] - d_ab
+                    if delta < -1e-9:
+                        tour[i:j + 1] = reversed(tour[i:j + 1])
+                        b = tour[i]
+                        row_b = matrix[b]
+                        d_ab = row_a[b]
+                        improved = True
+        return tour
+
+    def allocate_days(self, num_stops: int, num_days: int) -> List[int]:
+        """
+        Split the day budget across stops, giving every stop at least one day.
+
+        Args:
+            num_stops (int): Number of parks on the route
+            num_days (int): Total days available
+
+        Returns:
+            List[int]: Days allocated to each stop, in route order
+
+        Raises:
+            HTTPException: If there are fewer days than parks
+        """
+        if num_days < num_stops:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A {num_days} day trip cannot cover {num_stops} parks"
+            )
+        base, extra = divmod(num_days, num_stops)
+        return [base + 1 if index < extra else base for index in range(num_stops)]
+
+    def plan_trip(self, parks: List[Dict], num_days: int) -> List[Dict]:
+        """
+        Plan a road trip across the given parks.
+
+        Args:
+            parks (List[Dict]): Parks with 'id', 'name', 'parkcode', 'latitude' and 'longitude';
+                                the route starts at the first one
+            num_days (int): Total days available for the trip
+
+        Returns:
+            List[Dict]: One entry per park in visiting order with start day, day count
+                        and driving distance from the previous stop
+
+        Raises:
+            HTTPException: If a park has no coordinates or the day budget is too small
+        """
+        missing = [park['parkcode'] for park in parks if park.get('latitude') is None or park.get('longitude') is None]
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Missing coordinates for parks: {', '.join(missing)}"
+            )
+
+        matrix = self.build_distance_matrix([(park['latitude'], park['longitude']) for park in parks])
+        order = self.order_stops(matrix)
+        days = self.allocate_days(len(order), num_days)
+
+        stops = []
+        day_number = 1
+        previous = None
+        for index, stop in enumerate(order):
+            park = parks[stop]
+            stops.append({
+                "park_id": str(park['id']),
+                "parkcode": park['parkcode'],
+                "name": park['name'],
+                "day_number": day_number,
+                "num_days": days[index],
+                "miles_from_previous": round(matrix[previous][stop], 1) if previous is not None else 0.0
+            })
+            day_number += days[index]
+            previous = stop
+        return stops
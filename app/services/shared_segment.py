@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+
+# Header: generation counter (odd while a write is in progress) and payload length
+HEADER = struct.Struct("QQ")
+
+logger = logging.getLogger(__name__)
+
+class SharedSegment:
+    """
+    A JSON document in a shared-memory segment, created by the gunicorn master,
+    written by its refresher process and read by every worker. Writes use a seqlock: readers retry while the
+    generation is odd or moves under them, and only re-parse the document
+    when the generation changes.
+    """
+
+    def __init__(self, env_name: str):
+        """
+        Args:
+            env_name (str): Environment variable the master uses to advertise the
+                            segment name to forked workers
+        """
+        self.env_name = env_name
+        self._segment: Optional[shared_memory.SharedMemory] = None
+        self._owner = False
+        self._generation = None
+        self._document: Optional[Dict] = None
+
+    # --- Master side -------------------------------------------------------
+
+    def create(self, name: str, size: int):
+        """Create the segment and advertise its name to workers."""
+        self._segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._owner = True
+        HEADER.pack_into(self._segment.buf, 0, 0, 0)
+        os.environ[self.env_name] = name
+
+    def publish(self, document: Dict) -> bool:
+        """
+        Write a new document into the segment.
+
+        Returns:
+            bool: False if the document did not change or does not fit
+        """
+        payload = json.dumps(document, default=str, sort_keys=True).encode("utf-8")
+        buf = self._segment.buf
+        generation, length = HEADER.unpack_from(buf, 0)
+        if length == len(payload) and bytes(buf[HEADER.size:HEADER.size + length]) == payload:
+            return False
+        if HEADER.size + len(payload) > self._segment.size:
+            logger.error("Document (%d bytes) does not fit in shared memory segment %s", len(payload), self._segment.name)
+            return False
+
+        HEADER.pack_into(buf, 0, generation + 1, length)
+        buf[HEADER.size:HEADER.size + len(payload)] = payload
+        HEADER.pack_into(buf, 0, generation + 2, len(payload))
+        return True
+
+    def close(self):
+        """Release the segment, unlinking it if this process created it."""
+        if self._segment is not None:
+            self._segment.close()
+            if self._owner:
+                self._segment.unlink()
+            self._segment = None
+
+    # --- Worker side -------------------------------------------------------
+
+    @property
+    def advertised(self) -> bool:
+        """Whether a master created a segment for this process to read."""
+        return bool(os.environ.get(self.env_name))
+
+    def _attach(self) -> bool:
+        if self._segment is not None:
+            return True
+        name = os.environ.get(self.env_name)
+        if not name:
+            return False
+        try:
+            self._segment = shared_memory.SharedMemory(name=name)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def read(self) -> Optional[Dict]:
+        """The current document (the same object until it is republished), or None."""
+        if not self._attach():
+            return None
+        buf = self._segment.buf
+        for _ in range(100):
+            generation, length = HEADER.unpack_from(buf, 0)
+            if generation == 0:
+                return None
+            if generation == self._generation:
+                return self._document
+            if generation % 2:
+                time.sleep(0.001)
+                continue
+            raw = bytes(buf[HEADER.size:HEADER.size + length])
+            if HEADER.unpack_from(buf, 0)[0] != generation:
+                continue
+            self._generation, self._document = generation, json.loads(raw)
+            return self._document
+        return None
+
+    @property
+    def generation(self) -> Optional[int]:
+        """Generation of the document last read, which changes on every publish."""
+        return self._generation if self.read() is not None else None
@@ -0,0 +1,199 @@
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z]+")
+STOPWORDS = {
+    "the", "and", "for", "are", "but", "not", "you", "all", "any", "can", "has", "have", "its",
+    "was", "were", "with", "this", "that", "from", "into", "over", "than", "then", "they", "their",
+    "there", "these", "those", "which", "while", "where", "when", "what", "who", "whom", "will",
+    "also", "more", "most", "some", "such", "only", "other", "about", "each", "many", "much",
+    "park", "parks", "national", "one", "two", "per", "our", "your", "out", "own", "its"
+}
+
+# Terms added to a recommendation query for each fitness level
+FITNESS_TERMS = {
+    "easy": ["scenic", "drive", "overlook", "boardwalk", "visitor", "center", "wildlife", "viewing"],
+    "beginner": ["scenic", "drive", "overlook", "boardwalk", "visitor", "center", "wildlife", "viewing"],
+    "moderate": ["trail", "hiking", "lake", "waterfall", "canyon", "forest"],
+    "intermediate": ["trail", "hiking", "lake", "waterfall", "canyon", "forest"],
+    "strenuous": ["backcountry", "wilderness", "summit", "peak", "climbing", "mountaineering", "glacier"],
+    "advanced": ["backcountry", "wilderness", "summit", "peak", "climbing", "mountaineering", "glacier"]
+}
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 2 and token not in STOPWORDS]
+
+class _IndexState(NamedTuple):
+    """One generation of the index, swapped in as a whole."""
+    term_counts: Dict[str, Tuple[str, Counter]]
+    codes: List[str]
+    names: List[str]
+    positions: Dict[str, int]
+    vectors: List[Dict[str, float]]
+    postings: Dict[str, List[Tuple[int, float]]]
+    idf: Dict[str, float]
+
+class ParkSimilarityIndex:
+    """
+    Offline TF-IDF index over park names, descriptions and activities.
+    Vectors are L2-normalised and stored as an inverted index of postings,
+    so a cosine top-k query only touches parks that share a term with it.
+    The index is rebuilt when the park set changes; parks whose content is
+    unchanged reuse their cached term counts. Each rebuild produces a new
+    state that replaces the old one in a single assignment, so queries
+    running on other threads always see one consistent generation.
+    """
+
+    def __init__(self, loader: Callable[[], List[Dict]], version: Callable[[], Optional[int]], ttl: float = 300.0):
+        """
+        Args:
+            loader: Returns the current list of parks
+            version: Cheap check for the park source's version. When it returns
+                     None the parks are reloaded every `ttl` seconds instead.
+            ttl (float): Reload interval for sources without a version
+        """
+        self.loader = loader
+        self.version = version
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0.0
+        self._state = _IndexState({}, [], [], {}, [], {}, {})
+
+    def _is_current(self, version: Optional[int]) -> bool:
+        if not self._state.codes:
+            return False
+        if version is not None:
+            return version == self._version
+        return self._version is None and time.monotonic() - self._loaded_at < self.ttl
+
+    def ensure_current(self) -> _IndexState:
+        """Rebuild the index if the park source has changed, and return the current state."""
+        version = self.version()
+        if not self._is_current(version):
+            with self._lock:
+                # Another thread may have rebuilt it while we waited
+                if not self._is_current(version):
+                    self._state = self._build(self.loader(), self._state.term_counts)
+                    self._version = version
+                    self._loaded_at = time.monotonic()
+        return self._state
+
+    def _build(self, parks: List[Dict], previous_counts: Dict[str, Tuple[str, Counter]]) -> _IndexState:
+        term_counts = {}
+        for park in parks:
+            # Reuse term counts for parks whose indexed text hasn't changed
+            text_hash = self._park_hash(park)
+            cached = previous_counts.get(park["parkcode"])
+            if cached and cached[0] == text_hash:
+                term_counts[park["parkcode"]] = cached
+            else:
+                term_counts[park["parkcode"]] = (text_hash, self._park_terms(park))
+
+        codes = sorted(term_counts)
+        document_frequency = Counter()
+        for code in codes:
+            document_frequency.update(term_counts[code][1].keys())
+        total = len(codes)
+        idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        vectors = [self._weigh(term_counts[code][1], idf) for code in codes]
+        postings = defaultdict(list)
+        for position, vector in enumerate(vectors):
+            for term, weight in vector.items():
+                postings[term].append((position, weight))
+
+        names = {park["parkcode"]: park["name"] for park in parks}
+        return _IndexState(
+            term_counts=term_counts,
+            codes=codes,
+            names=[names[code] for code in codes],
+            positions={code: position for position, code in enumerate(codes)},
+            vectors=vectors,
+            postings=dict(postings),
+            idf=idf
+        )
+
+    def _park_hash(self, park: Dict) -> str:
+        text = "\n".join([park["name"], park.get("description") or "", " ".join(park.get("activities") or [])])
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _park_terms(self, park: Dict) -> Counter:
+        counts = Counter(tokenize(park.get("description") or ""))
+        # Names and activities say more about a park than incidental description words
+        for token in tokenize(park["name"]):
+            counts[token] += 2
+        for activity in park.get("activities") or []:
+            for token in tokenize(activity):
+                counts[token] += 3
+        return counts
+
+    def _weigh(self, counts: Counter, idf: Dict[str, float]) -> Dict[str, float]:
+        weights = {term: (1 + math.log(count)) * idf[term] for term, count in counts.items() if term in idf}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        return {term: weight / norm for term, weight in weights.items()} if norm else {}
+
+    def query_vector(self, terms: List[str], state: Optional[_IndexState] = None) -> Dict[str, float]:
+        """Build a normalised query vector from free-text terms."""
+        state = state or self.ensure_current()
+        counts = Counter()
+        for term in terms:
+            counts.update(tokenize(term))
+        return self._weigh(counts, state.idf)
+
+    def top_k(
+        self,
+        queries: List[Dict[str, float]],
+        k: int = 5,
+        exclude: Optional[List[Optional[str]]] = None,
+        state: Optional[_IndexState] = None
+    ) -> List[List[Dict]]:
+        """
+        Cosine-similarity top-k for a batch of query vectors.
+
+        Args:
+            queries (List[Dict[str, float]]): Normalised term vectors
+            k (int): Results per query
+            exclude (Optional[List[Optional[str]]]): Parkcode to leave out of each query's results
+            state (Optional[_IndexState]): Generation to query; defaults to the current one
+
+        Returns:
+            List[List[Dict]]: For each query, parks ordered by descending score
+        """
+        state = state or self._state
+        results = []
+        for index, query in enumerate(queries):
+            scores = defaultdict(float)
+            for term, weight in query.items():
+                for position, park_weight in state.postings.get(term, ()):
+                    scores[position] += weight * park_weight
+
+            skip = state.positions.get(exclude[index]) if exclude else None
+            ranked = sorted(
+                ((score, position) for position, score in scores.items() if position != skip),
+                reverse=True
+            )[:k]
+            results.append([
+                {"parkcode": state.codes[position], "name": state.names[position], "score": round(score, 4)}
+                for score, position in ranked
+            ])
+        return results
+
+    def similar(self, parkcode: str, k: int = 5) -> Optional[List[Dict]]:
+        """Parks most similar to the given one, or None if the park is unknown."""
+        state = self.ensure_current()
+        position = state.positions.get(parkcode)
+        if position is None:
+            return None
+        return self.top_k([state.vectors[position]], k, exclude=[parkcode], state=state)[0]
+
+    def recommend(self, activities: List[str], fitness_level: str, k: int = 5) -> List[Dict]:
+        """Parks best matching a set of preferred activities and a fitness level."""
+        terms = list(activities) + FITNESS_TERMS.get(fitness_level.lower(), [])
+        state = self.ensure_current()
+        return self.top_k([self.query_vector(terms, state)], k, state=state)[0]
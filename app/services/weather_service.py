@@ -2,26 +2,60 @@ import requests
 from typing import Dict, Optional
 from fastapi import HTTPException
 from app.config.config import settings
+from app.services.resilience import weather_upstream
 
 class WeatherService:
     def __init__(self):
         self.api_key = settings.WEATHER_API_KEY
         self.base_url = "https://api.weatherapi.com/v1"
+        # Last good forecast per location, served while the weather API is failing
+        self._stale: Dict[str, Dict] = {}
+
+    def fetch_forecast(self, latitude: float, longitude: float, days: int = 7) -> Dict:
+        """Blocking forecast request; call from a worker thread"""
+        response = requests.get(
+            f"{self.base_url}/forecast.json",
+            params={
+                "key": self.api_key,
+                "q": f"{latitude},{longitude}",
+                "days": days
+            },
+            timeout=weather_upstream.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def summarize_forecast(self, forecast: Dict) -> Dict:
+        """Reduce a forecast.json payload to the fields the itinerary prompt uses"""
+        current = forecast.get("current", {})
+        return {
+            "current": {
+                "temp": current.get("temp_f"),
+                "conditions": current.get("condition", {}).get("text", "Unknown")
+            },
+            "days": [
+                {
+                    "date": day["date"],
+                    "high": day["day"].get("maxtemp_f"),
+                    "low": day["day"].get("mintemp_f"),
+                    "conditions": day["day"].get("condition", {}).get("text", "Unknown"),
+                    "chance_of_rain": day["day"].get("daily_chance_of_rain"),
+                    "chance_of_snow": day["day"].get("daily_chance_of_snow")
+                }
+                for day in forecast.get("forecast", {}).get("forecastday", [])
+            ]
+        }
 
     async def get_weather(self, latitude: float, longitude: float) -> Dict:
         """Get weather information for a specific location"""
+        key = f"{latitude},{longitude}"
         try:
-            response = requests.get(
-                f"{self.base_url}/forecast.json",
-                params={
-                    "key": self.api_key,
-                    "q": f"{latitude},{longitude}",
-                    "days": 7
-                }
-            )
-            response.raise_for_status()
-            return response.json()
+            forecast = await weather_upstream.call(self.fetch_forecast, latitude, longitude)
+            self._stale[key] = forecast
+            return forecast
         except Exception as e:
+            if key in self._stale:
+                return self._stale[key]
             raise HTTPException(
                 status_code=500,
                 detail=f"Error fetching weather data: {str(e)}"
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import queue
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueListener
+from typing import Dict, List, Optional
+from app.config.config import settings
+from app.config.logging_config import RequestQueueHandler
+
+class Trace:
+    """Timing spans recorded while handling one request."""
+
+    def __init__(self, request_id: str, method: str, path: str):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.status_code: Optional[int] = None
+        self.spans: List[Dict] = []
+
+    def finish(self, status_code: int):
+        self.status_code = status_code
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: top-level span durations summed by name, plus the total."""
+        totals: Dict[str, float] = {}
+        for recorded in self.spans:
+            if recorded["parent"] is None:
+                totals[recorded["name"]] = totals.get(recorded["name"], 0.0) + (recorded["duration_ms"] or 0.0)
+        metrics = [f"{name};dur={duration:.1f}" for name, duration in totals.items()]
+        metrics.append(f"total;dur={self.duration_ms:.1f}")
+        return ", ".join(metrics)
+
+    def to_dict(self) -> Dict:
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2) if self.duration_ms is not None else None,
+            "status_code": self.status_code,
+            "spans": self.spans
+        }
+
+    def __str__(self) -> str:
+        return json.dumps(self.to_dict(), default=str)
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+# Index of the enclosing span; a context variable so concurrent tasks nest correctly
+_current_span: ContextVar[Optional[int]] = ContextVar("current_span", default=None)
+
+@contextmanager
+def span(name: str):
+    """
+    Time a stage of the current request. Works around sync code and awaits alike;
+    does nothing outside a traced request.
+    """
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    index = len(trace.spans)
+    recorded = {
+        "name": name,
+        "parent": _current_span.get(),
+        "offset_ms": round((time.perf_counter() - trace._start) * 1000, 2),
+        "duration_ms": None
+    }
+    trace.spans.append(recorded)
+    token = _current_span.set(index)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorded["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        _current_span.reset(token)
+
+class TraceRecorder:
+    """
+    Keeps sampled traces in an in-memory ring buffer and optionally appends
+    them as JSON lines to a file through a background writer thread. Forked
+    children (preloaded gunicorn workers) start their own writer thread.
+    """
+
+    def __init__(self, sample_rate: float, buffer_size: int, file_path: Optional[str] = None):
+        self.sample_rate = sample_rate
+        self._traces = deque(maxlen=buffer_size)
+        self._export: Optional[logging.Logger] = None
+        self._listener: Optional[QueueListener] = None
+        self._file_handler: Optional[logging.Handler] = None
+        if file_path:
+            # Opened on first write, so each process gets its own file descriptor
+            self._file_handler = logging.FileHandler(file_path, delay=True)
+            self._file_handler.setFormatter(logging.Formatter("%(message)s"))
+            self._export = logging.getLogger("app.traces")
+            self._export.propagate = False
+            self._export.setLevel(logging.INFO)
+            self._export.handlers = [RequestQueueHandler(queue.SimpleQueue())]
+            self._start_listener()
+            os.register_at_fork(after_in_child=self._start_listener)
+
+    def _start_listener(self):
+        if self._file_handler is None or self._export is None:
+            return
+        trace_queue = queue.SimpleQueue()
+        self._export.handlers[0].queue = trace_queue
+        self._listener = QueueListener(trace_queue, self._file_handler)
+        self._listener.start()
+
+    def record(self, trace: Trace):
+        if random.random() >= self.sample_rate:
+            return
+        self._traces.append(trace)
+        if self._export is not None:
+            self._export.info("%s", trace)
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        return [trace.to_dict() for trace in list(self._traces)[-limit:]][::-1]
+
+    def find(self, request_id: str) -> Optional[Dict]:
+        for trace in reversed(self._traces):
+            if trace.request_id == request_id:
+                return trace.to_dict()
+        return None
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+trace_recorder = TraceRecorder(settings.TRACE_SAMPLE_RATE, settings.TRACE_BUFFER_SIZE, settings.TRACE_FILE)
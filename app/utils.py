@@ -2,16 +2,27 @@ from fastapi import HTTPException
 from sqlmodel import Session, select
 from app.models.park import Park
 from app.dependencies import get_db
+from app.services.park_catalog import park_catalog
+import logging
+
+logger = logging.getLogger(__name__)
 
 def get_park_data(park_code: str):
     """Retrieve park data based on park code."""
-    print(f"Starting park data query for: {park_code}")
+    logger.debug("Starting park data query for: %s", park_code)
     try:
+        if park_catalog.available:
+            park = park_catalog.get(park_code)
+            if not park:
+                logger.info("No data found for parkcode: %s", park_code)
+                raise HTTPException(status_code=404, detail="Park not found")
+            return {key: park[key] for key in ("id", "name", "description", "parkcode", "location", "created_at")}
+
         db = next(get_db())
         park = db.exec(select(Park).where(Park.parkcode == park_code)).first()
         
         if not park:
-            print(f"No data found for parkcode: {park_code}")
+            logger.info("No data found for parkcode: %s", park_code)
             raise HTTPException(status_code=404, detail="Park not found")
 
         # Convert SQLModel object to dict with the exact structure needed
@@ -26,12 +37,12 @@ def get_park_data(park_code: str):
         return park_dict
 
     except Exception as e:
-        print(f"Error in get_park_data: {str(e)}")
+        logger.error("Error in get_park_data: %s", e)
         raise
 
 def get_weather_data(location: dict):
     """Retrieve weather data based on location."""
-    print(f"Processing location data: {location}")
+    logger.debug("Processing location data: %s", location)
     lat = location.get("lat")
     lon = location.get("lng")
     
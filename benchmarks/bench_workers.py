@@ -0,0 +1,98 @@
+"""
+Measure requests per second as the gunicorn worker count grows.
+
+Starts the app with `gunicorn -c gunicorn.conf.py` for each worker count,
+drives it with concurrent keep-alive clients and prints one row per run.
+Requires the same .env as the app itself (DATABASE_URL, SUPABASE_*, ...).
+
+Usage:
+    python -m benchmarks.bench_workers --max-workers 4 --path /parks --duration 10
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+import httpx
+
+async def wait_until_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{base_url}/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+async def drive(base_url: str, path: str, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def client_loop(client: httpx.AsyncClient):
+        nonlocal errors
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 500:
+                    errors += 1
+            except httpx.TransportError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        started = time.monotonic()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+    }
+
+def run(workers: int, args) -> dict:
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(args.port))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app", "--access-logfile", ""],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(wait_until_ready(base_url))
+        # Warm every worker's connection pool and catalog before measuring
+        asyncio.run(drive(base_url, args.path, args.concurrency, 2))
+        return asyncio.run(drive(base_url, args.path, args.concurrency, args.duration))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark RPS scaling across gunicorn worker counts")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--path", default="/parks")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'requests':>9} {'errors':>6} {'rps':>9} {'p50 ms':>8} {'p99 ms':>8} {'scaling':>7}")
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        result = run(workers, args)
+        baseline = baseline or result["rps"]
+        print(
+            f"{workers:>7} {result['requests']:>9} {result['errors']:>6} {result['rps']:>9.1f} "
+            f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['rps'] / baseline:>6.2f}x"
+        )
@@ -0,0 +1,30 @@
+"""
+Session-wide blocking-call check for the test suite.
+
+The event-loop monitor runs for every test that starts the app (e.g. with
+`with TestClient(app)`). At the end of the session any blocking call site that
+isn't listed in loop_monitor_baseline.json fails the run. Set
+LOOP_MONITOR_UPDATE_BASELINE=true to accept the call sites seen instead.
+"""
+import os
+import pytest
+from app.loop_monitor import loop_monitor
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "loop_monitor_baseline.json")
+
+def pytest_configure(config):
+    loop_monitor.enabled = True
+    loop_monitor.baseline_path = loop_monitor.baseline_path or DEFAULT_BASELINE
+
+def pytest_sessionfinish(session, exitstatus):
+    if os.getenv("LOOP_MONITOR_UPDATE_BASELINE", "false").lower() == "true":
+        loop_monitor.write_baseline()
+        return
+    try:
+        loop_monitor.assert_no_new_blocking_calls()
+    except AssertionError as e:
+        reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+        if reporter is not None:
+            reporter.ensure_newline()
+            reporter.write_line(str(e), red=True)
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
@@ -0,0 +1,91 @@
+# Gunicorn configuration for multi-worker deployments.
+#
+# Run with: gunicorn -c gunicorn.conf.py app.main:app
+# WEB_CONCURRENCY overrides the derived worker count.
+import os
+import signal
+import threading
+from app.config.config import settings
+from app.services.park_catalog import park_catalog
+from app.services.forecast_refresher import forecast_refresher
+
+def _available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def _available_memory_mb() -> int:
+    # Prefer the cgroup limit inside containers, then physical memory
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as limit_file:
+                value = limit_file.read().strip()
+            if value.isdigit() and int(value) < 1 << 50:
+                return int(value) // (1024 * 1024)
+        except OSError:
+            continue
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+
+def _worker_count() -> int:
+    if os.getenv("WEB_CONCURRENCY"):
+        return max(1, int(os.environ["WEB_CONCURRENCY"]))
+    per_worker_mb = int(os.getenv("WORKER_MEMORY_MB", "200"))
+    by_cpu = 2 * _available_cpus()
+    # Leave a fifth of memory for the master and the OS
+    by_memory = int(_available_memory_mb() * 0.8) // per_worker_mb
+    return max(1, min(by_cpu, by_memory))
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = _worker_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+graceful_timeout = 30
+accesslog = "-"
+
+_refresher_pid = None
+
+def _run_refresher(server):
+    # Runs in a child that never forks, so its threads can't leave held locks in a worker
+    try:
+        park_catalog.start_refresher(settings.DATABASE_URL, settings.PARK_CATALOG_REFRESH_SECONDS)
+        if settings.WEATHER_API_KEY:
+            forecast_refresher.run_shared()
+        else:
+            threading.Event().wait()
+    except Exception as e:
+        server.log.error(f"Refresher process failed: {str(e)}")
+    finally:
+        # Never run the master's exit handlers, which unlink the segments
+        os._exit(1)
+
+def on_starting(server):
+    global _refresher_pid
+    # Build the park catalog once in the master; workers attach to it after fork
+    park_catalog.create(f"park_catalog_{os.getpid()}", settings.PARK_CATALOG_SIZE)
+    try:
+        park_catalog.publish(park_catalog.load_from_database(settings.DATABASE_URL))
+    except Exception as e:
+        server.log.error(f"Initial park catalog build failed, workers will read from the database: {str(e)}")
+    # One forecast refresher for all workers, published to its own segment
+    if settings.WEATHER_API_KEY:
+        forecast_refresher.create_shared(f"forecasts_{os.getpid()}", settings.WEATHER_SEGMENT_SIZE)
+
+    # The master forks workers for as long as it runs, so its background
+    # refreshes live in a separate process rather than in master threads
+    _refresher_pid = os.fork()
+    if _refresher_pid == 0:
+        _run_refresher(server)
+    server.log.info(f"Started refresher process {_refresher_pid}; starting {workers} workers")
+
+def on_exit(server):
+    if _refresher_pid:
+        try:
+            os.kill(_refresher_pid, signal.SIGTERM)
+            os.waitpid(_refresher_pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            # Already gone, or reaped by the master along with its workers
+            pass
+    forecast_refresher.close_shared()
+    park_catalog.close()
@@ -0,0 +1,4 @@
+-- Parsed day plan stored next to each itinerary description.
+-- Written by itinerary create, save and update; filled for existing rows by
+-- python -m app.jobs.backfill_day_plans
+ALTER TABLE itineraries ADD COLUMN IF NOT EXISTS day_plan jsonb;
@@ -0,0 +1,3 @@
+-- The park sync job upserts on parkcode (ON CONFLICT (parkcode)), which needs
+-- a unique index. Remove any duplicate parkcodes before creating it.
+CREATE UNIQUE INDEX IF NOT EXISTS parks_parkcode_key ON parks (parkcode);
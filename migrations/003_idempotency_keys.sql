@@ -0,0 +1,12 @@
+-- Idempotency-Key outcomes shared by all workers (app.models.idempotency).
+-- The primary key makes (user_id, key) unique, which is what claims a key.
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    user_id varchar NOT NULL,
+    key varchar(255) NOT NULL,
+    fingerprint varchar NOT NULL,
+    response varchar,
+    created_at timestamp NOT NULL,
+    expires_at timestamp NOT NULL,
+    PRIMARY KEY (user_id, key)
+);
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at);
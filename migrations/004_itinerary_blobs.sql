@@ -0,0 +1,14 @@
+-- Deduplicated itinerary bodies (app.services.blob_store). Itinerary rows
+-- reference a blob by description_hash; python -m app.jobs.migrate_itinerary_blobs
+-- moves existing inline descriptions over once this has been applied.
+CREATE TABLE IF NOT EXISTS itinerary_blobs (
+    hash varchar PRIMARY KEY,
+    data varchar NOT NULL,
+    size integer NOT NULL,
+    created_at timestamp NOT NULL DEFAULT now(),
+    last_referenced_at timestamp NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_itinerary_blobs_last_referenced_at ON itinerary_blobs (last_referenced_at);
+
+ALTER TABLE itineraries ADD COLUMN IF NOT EXISTS description_hash varchar;
+CREATE INDEX IF NOT EXISTS ix_itineraries_description_hash ON itineraries (description_hash);